@@ -0,0 +1,35 @@
+import heapq
+import itertools
+
+class ActivationZone:
+    """ビューポートから離れたエンティティを休止させ、近づいたら起こす"""
+    def __init__(self, screen_width, margin=100):
+        self.margin = margin
+        self.wake_x = screen_width + margin  # これより右にあるエンティティは休止
+        # (起床するスクロール位置, 登録順, 休止時のスクロール位置, 種類, エンティティ) のヒープ
+        self._sleeping = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._sleeping)
+
+    def is_outside(self, entity):
+        return entity.x > self.wake_x
+
+    def add(self, kind, entity, scroll_x):
+        """エンティティを休止させる（休止中は地形と一緒にスクロールする扱い）"""
+        wake_scroll = scroll_x + (entity.x - self.wake_x)
+        heapq.heappush(self._sleeping, (wake_scroll, next(self._order), scroll_x, kind, entity))
+
+    def wake(self, scroll_x):
+        """起床位置に達したエンティティを (種類, エンティティ) のリストで返す"""
+        woken = []
+        while self._sleeping and self._sleeping[0][0] <= scroll_x:
+            _, _, slept_at, kind, entity = heapq.heappop(self._sleeping)
+            # 休止中に進んだスクロール分だけ位置をずらす
+            entity.x -= scroll_x - slept_at
+            woken.append((kind, entity))
+        return woken
+
+    def clear(self):
+        self._sleeping = []
@@ -0,0 +1,111 @@
+import pygame
+import math
+
+# 生成済みのアニメーションフレーム、フォント、文字列画像のキャッシュ
+_frame_cache = {}
+_font_cache = {}
+_text_cache = {}
+MAX_CACHED_TEXTS = 256
+
+# get_ticks() からフレーム番号に変換する際のフレームレート
+ANIMATION_FPS = 60
+
+def get_frames(key, count, builder):
+    """キーに対応するアニメーションフレームを取得（初回のみ builder(i) で生成）"""
+    frames = _frame_cache.get(key)
+    if frames is None:
+        frames = [builder(i) for i in range(count)]
+        _frame_cache[key] = frames
+    return frames
+
+def tick_frame(ticks, count):
+    """経過ミリ秒からループアニメーションのフレーム番号を求める"""
+    return (ticks * ANIMATION_FPS // 1000) % count
+
+def get_font(size):
+    font = _font_cache.get(size)
+    if font is None:
+        font = pygame.font.SysFont(None, size)
+        _font_cache[size] = font
+    return font
+
+def render_text(size, text, color):
+    """文字列画像を取得（同じ文字列は再描画しない）"""
+    key = (size, text, color)
+    surface = _text_cache.get(key)
+    if surface is None:
+        if len(_text_cache) >= MAX_CACHED_TEXTS:
+            _text_cache.clear()
+        surface = get_font(size).render(text, True, color)
+        _text_cache[key] = surface
+    return surface
+
+def _ring_surface(size):
+    return pygame.Surface((size, size), pygame.SRCALPHA)
+
+def hit_effect_frames(max_radius, duration, inner_ring=True):
+    """ヒットエフェクト（広がる円）のフレーム。インデックスは effect['timer']"""
+    size = max_radius * 2 + 4
+    center = size // 2
+
+    def build(timer):
+        surface = _ring_surface(size)
+        radius = max_radius * (timer / duration)
+        g = 255 * (1 - timer / duration)  # 黄色から赤へのグラデーション
+        pygame.draw.circle(surface, (255, g, 0), (center, center), int(radius), 2)
+        if inner_ring:
+            inner_radius = max(1, radius * 0.6)
+            pygame.draw.circle(surface, (255, 255, 200), (center, center), int(inner_radius), 1)
+        return surface
+
+    return get_frames(("hit", max_radius, duration, inner_ring), duration + 1, build)
+
+def charge_glow_frames(start, end):
+    """ボスのレーザー充電エフェクトのフレーム。インデックスは laser_charging - start"""
+    def build(i):
+        radius = i / 2
+        surface = pygame.Surface((int(radius * 2), int(radius * 2)), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (255, 100, 100, 128), (radius, radius), radius)
+        return surface
+
+    return get_frames(("charge", start, end), end - start + 1, build)
+
+def shield_frames(base_radius, ripples=3):
+    """シールドと波紋のフレーム（sin の1周期分）"""
+    count = round(2 * math.pi * 100 * ANIMATION_FPS / 1000)
+    size = int(base_radius + 4) * 2
+    center = size // 2
+
+    def build(i):
+        ticks = i * 1000 / ANIMATION_FPS
+        surface = _ring_surface(size)
+        shield_radius = base_radius + math.sin(ticks / 100) * 3
+        pygame.draw.circle(surface, (100, 100, 255), (center, center), shield_radius, 2)
+        # エネルギー波紋
+        wave_offset = (ticks % 30) / 30
+        for j in range(ripples):
+            wave_radius = shield_radius - 10 + j * 7 + wave_offset * 7
+            if wave_radius < shield_radius:
+                pygame.draw.circle(surface, (150, 150, 255), (center, center), wave_radius, 1)
+        return surface
+
+    return get_frames(("shield", base_radius, ripples), count, build)
+
+def invincible_frames(base_radius):
+    """無敵状態の波紋のフレーム（sin の1周期分）"""
+    count = round(2 * math.pi * 50 * ANIMATION_FPS / 1000)
+    size = int(base_radius + 3) * 2
+    center = size // 2
+
+    def build(i):
+        ticks = i * 1000 / ANIMATION_FPS
+        surface = _ring_surface(size)
+        radius = base_radius + math.sin(ticks / 50) * 2
+        pygame.draw.circle(surface, (100, 200, 255), (center, center), radius, 1)
+        return surface
+
+    return get_frames(("invincible", base_radius), count, build)
+
+def blit_centered(screen, surface, x, y):
+    """フレームを中心座標に合わせて描画"""
+    screen.blit(surface, (int(x) - surface.get_width() // 2, int(y) - surface.get_height() // 2))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""BGM 生成のベンチマーク: 音符ごとのループで合成する旧実装と NoteTable による合成を比較する
+
+    python bench_synth.py [--sample-rate 22050 44100] [--duration 10] [--repeat 5]
+"""
+import argparse
+import time
+import numpy as np
+from sounds import render_bgm, render_boss_bgm
+
+def legacy_bgm(sample_rate=22050, duration=10.0):
+    """旧実装（音符ごとに np.sin を計算するループ）の通常BGM"""
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    
+    # --- 通常BGM (より明るく爽快な曲調に変更) ---
+    
+    # ベースリズム (よりテンポアップ)
+    beat_freq = 4.5  # beats per second (4から4.5に増加)
+    beat = 0.3 * np.sin(2 * np.pi * beat_freq * t)
+    beat = beat * (beat > 0)  # Keep only positive parts
+    
+    # ベースライン (より明るい音階を使用)
+    bass_notes = [262, 330, 392, 349]  # C4, E4, G4, F4 (明るい長調)
+    bass_pattern_duration = 4.0  # seconds per pattern
+    bass = np.zeros_like(t)
+    
+    for i in range(int(duration / bass_pattern_duration)):
+        start_idx = int(i * bass_pattern_duration * sample_rate)
+        for j, note in enumerate(bass_notes):
+            note_start = start_idx + int(j * bass_pattern_duration / len(bass_notes) * sample_rate)
+            note_end = min(start_idx + int((j + 1) * bass_pattern_duration / len(bass_notes) * sample_rate), len(t))
+            if note_start < len(t) and note_end > note_start:
+                note_t = t[note_start:note_end] - t[note_start]
+                bass[note_start:note_end] += 0.3 * np.sin(2 * np.pi * note * note_t)  # 0.25から0.3に増加
+    
+    # メロディ (より明るく軽快なメロディ)
+    melody_notes = [523, 587, 659, 698, 784, 698, 659, 587]  # C5, D5, E5, F5, G5, F5, E5, D5
+    melody_pattern_duration = 8.0  # seconds per pattern
+    melody = np.zeros_like(t)
+    
+    for i in range(int(duration / melody_pattern_duration)):
+        start_idx = int(i * melody_pattern_duration * sample_rate)
+        for j, note in enumerate(melody_notes):
+            note_start = start_idx + int(j * melody_pattern_duration / len(melody_notes) * sample_rate)
+            note_end = min(start_idx + int((j + 1) * melody_pattern_duration / len(melody_notes) * sample_rate), len(t))
+            if note_start < len(t) and note_end > note_start:
+                note_t = t[note_start:note_end] - t[note_start]
+                if len(note_t) > 0:
+                    envelope = np.exp(-3 * (note_t - 0.5 * (note_t[-1] - note_t[0])) ** 2 / max(0.0001, (note_t[-1] - note_t[0])) ** 2)
+                    melody[note_start:note_end] += 0.25 * np.sin(2 * np.pi * note * note_t) * envelope  # 0.2から0.25に増加
+    
+    # 高音部の装飾 (より明るいアルペジオ)
+    high_notes = [784, 880, 988, 1047, 1175, 1047, 988, 880]  # G5, A5, B5, C6, D6, C6, B5, A5
+    high_pattern_duration = 4.0
+    high_melody = np.zeros_like(t)
+    
+    # 高音部の装飾をより多く
+    for i in range(int(duration / high_pattern_duration)):
+        start_idx = int(i * high_pattern_duration * sample_rate)
+        for j, note in enumerate(high_notes):
+            note_start = start_idx + int(j * high_pattern_duration / len(high_notes) * sample_rate)
+            note_end = min(start_idx + int((j + 1) * high_pattern_duration / len(high_notes) * sample_rate), len(t))
+            if note_start < len(t) and note_end > note_start:
+                note_t = t[note_start:note_end] - t[note_start]
+                if len(note_t) > 0:
+                    # 短い音符のエンベロープ
+                    envelope = np.exp(-8 * (note_t - 0.2 * (note_t[-1] - note_t[0])) ** 2 / max(0.0001, (note_t[-1] - note_t[0])) ** 2)
+                    high_melody[note_start:note_end] += 0.2 * np.sin(2 * np.pi * note * note_t) * envelope  # 0.15から0.2に増加
+    
+    # 明るい効果音を追加
+    bright_fx = np.zeros_like(t)
+    fx_pattern = [0.25, 0.75, 1.25, 1.75, 2.25, 2.75, 3.25, 3.75, 4.25, 4.75, 5.25, 5.75, 6.25, 6.75, 7.25, 7.75, 8.25, 8.75, 9.25, 9.75]
+    for time_point in fx_pattern:
+        if time_point < duration:
+            idx = int(time_point * sample_rate)
+            # 明るい効果音の音符
+            fx_notes = [1047, 1175, 1319, 1397]  # C6, D6, E6, F6
+            note = fx_notes[int(time_point * 2) % len(fx_notes)]
+            
+            # 短い効果音
+            note_duration = 0.1
+            end_idx = min(idx + int(note_duration * sample_rate), len(t))
+            if idx < len(t):
+                note_t = np.arange(end_idx - idx) / sample_rate
+                envelope = np.exp(-12 * note_t)
+                bright_fx[idx:end_idx] += 0.15 * np.sin(2 * np.pi * note * note_t) * envelope
+    
+    # トラックを結合
+    bgm = beat + bass + melody + high_melody + bright_fx
+    
+    # 正規化
+    max_val = np.max(np.abs(bgm))
+    if max_val > 0:
+        bgm = bgm / max_val
+    return bgm
+
+def legacy_boss_bgm(sample_rate=22050, duration=10.0):
+    """旧実装（音符ごとに np.sin を計算するループ）のボス戦BGM"""
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    bass_pattern_duration = 4.0  # seconds per pattern
+    melody_pattern_duration = 8.0  # seconds per pattern
+    
+    # --- ボス戦BGM (より盛り上がる感じに変更) ---
+    
+    # 速いビート (よりテンポアップ)
+    boss_beat_freq = 6  # 速いビート (5から6に増加)
+    boss_beat = 0.5 * np.sin(2 * np.pi * boss_beat_freq * t)
+    boss_beat = boss_beat * (boss_beat > 0)
+    
+    # 力強いベースライン
+    boss_bass_notes = [196, 233, 196, 175]  # G3, A#3, G3, F3
+    boss_bass = np.zeros_like(t)
+    
+    for i in range(int(duration / bass_pattern_duration)):
+        start_idx = int(i * bass_pattern_duration * sample_rate)
+        for j, note in enumerate(boss_bass_notes):
+            note_start = start_idx + int(j * bass_pattern_duration / len(boss_bass_notes) * sample_rate)
+            note_end = min(start_idx + int((j + 1) * bass_pattern_duration / len(boss_bass_notes) * sample_rate), len(t))
+            if note_start < len(t):
+                note_t = t[note_start:note_end] - t[note_start]
+                # より強いベース音
+                boss_bass[note_start:note_end] += 0.45 * np.sin(2 * np.pi * note * note_t)
+    
+    # 盛り上がるメロディ
+    boss_melody_notes = [392, 466, 523, 622, 587, 523, 466, 392]  # G4, A#4, C5, D#5, D5, C5, A#4, G4
+    boss_melody = np.zeros_like(t)
+    
+    for i in range(int(duration / melody_pattern_duration)):
+        start_idx = int(i * melody_pattern_duration * sample_rate)
+        for j, note in enumerate(boss_melody_notes):
+            note_start = start_idx + int(j * melody_pattern_duration / len(boss_melody_notes) * sample_rate)
+            note_end = min(start_idx + int((j + 1) * melody_pattern_duration / len(boss_melody_notes) * sample_rate), len(t))
+            if note_start < len(t) and note_end > note_start:
+                note_t = t[note_start:note_end] - t[note_start]
+                if len(note_t) > 0:
+                    # より強いアタックのエンベロープ
+                    envelope = np.exp(-4 * (note_t - 0.3 * (note_t[-1] - note_t[0])) ** 2 / max(0.0001, (note_t[-1] - note_t[0])) ** 2)
+                    boss_melody[note_start:note_end] += 0.35 * np.sin(2 * np.pi * note * note_t) * envelope
+    
+    # 高音部の効果音 (より派手に)
+    boss_fx_notes = [784, 740, 784, 831, 784, 740, 698, 659]  # G5, F#5, G5, G#5, G5, F#5, F5, E5
+    boss_fx = np.zeros_like(t)
+    
+    # 不規則なリズムで高音を鳴らす (より多く)
+    fx_pattern = [0.3, 0.5, 0.7, 1.0, 1.2, 1.5, 1.8, 2.0, 2.3, 2.5, 2.8, 3.0, 3.3, 3.5, 3.8, 4.0,
+                 4.3, 4.5, 4.8, 5.0, 5.3, 5.5, 5.8, 6.0, 6.3, 6.5, 6.8, 7.0, 7.3, 7.5, 7.8, 8.0,
+                 8.3, 8.5, 8.8, 9.0, 9.3, 9.5, 9.8]
+    for time_point in fx_pattern:
+        if time_point < duration:
+            idx = int(time_point * sample_rate)
+            note_idx = int(time_point * 4) % len(boss_fx_notes)
+            note = boss_fx_notes[note_idx]
+            
+            # 短い効果音
+            note_duration = 0.1
+            end_idx = min(idx + int(note_duration * sample_rate), len(t))
+            if idx < len(t):
+                note_t = np.arange(end_idx - idx) / sample_rate
+                envelope = np.exp(-15 * note_t)
+                boss_fx[idx:end_idx] += 0.25 * np.sin(2 * np.pi * note * note_t) * envelope
+    
+    # ドラム風の効果音を追加
+    drum_pattern = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5]
+    drum_sound = np.zeros_like(t)
+    for time_point in drum_pattern:
+        if time_point < duration:
+            idx = int(time_point * sample_rate)
+            # ドラム音の長さ
+            drum_duration = 0.05
+            end_idx = min(idx + int(drum_duration * sample_rate), len(t))
+            if idx < len(t):
+                # ノイズベースのドラム音
+                drum_t = np.arange(end_idx - idx) / sample_rate
+                noise = np.random.uniform(-1, 1, len(drum_t))
+                envelope = np.exp(-30 * drum_t)
+                drum_sound[idx:end_idx] += 0.4 * noise * envelope
+    
+    # ボスBGMのトラックを結合
+    boss_bgm = boss_beat + boss_bass + boss_melody + boss_fx + drum_sound
+    
+    # 歪みを加えて迫力を出す
+    boss_bgm = np.tanh(boss_bgm * 1.8) * 0.8
+    
+    # 正規化
+    max_val = np.max(np.abs(boss_bgm))
+    if max_val > 0:
+        boss_bgm = boss_bgm / max_val
+    return boss_bgm
+
+def best_time(func, repeat):
+    """repeat 回実行した中で最も短い時間（秒）と最後の結果"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="BGM synthesis benchmark")
+    parser.add_argument("--sample-rate", type=int, nargs="+", default=[22050, 44100])
+    parser.add_argument("--duration", type=float, default=10.0, help="曲の長さ（秒）")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tracks = [("bgm", legacy_bgm, render_bgm), ("boss_bgm", legacy_boss_bgm, render_boss_bgm)]
+    print(f"{'track':<10}{'rate':>8}{'legacy ms':>12}{'table ms':>12}{'speedup':>10}{'max diff':>10}")
+    for sample_rate in args.sample_rate:
+        for name, legacy, table in tracks:
+            legacy_time, expected = best_time(lambda: legacy(sample_rate, args.duration), args.repeat)
+            table_time, actual = best_time(lambda: table(sample_rate, args.duration), args.repeat)
+            # ドラムはノイズなので波形の差はボス戦BGMでは参考値
+            diff = np.max(np.abs(expected - actual))
+            print(f"{name:<10}{sample_rate:>8}{legacy_time * 1000:>12.2f}{table_time * 1000:>12.2f}"
+                  f"{legacy_time / table_time:>9.1f}x{diff:>10.3f}")
+
+if __name__ == "__main__":
+    main()
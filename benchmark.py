@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""シナリオごとのフレーム時間ベンチマーク（SDL のダミードライバで画面・音なしに実行）
+
+    python benchmark.py [--frames 600] [--warmup 60] [--seed 1] [--scenario PATTERN ...]
+                        [--output result.json] [--compare previous.json]
+
+各シナリオは乱数の種を固定し、入力と状態の操作をスクリプトで行うので、同じ種と
+フレーム数なら同じ展開になる。update と render の時間をそれぞれ計測し、
+平均・p50・p99・最大を JSON で出力する。結果にはコミットのハッシュを含めるので、
+--compare で別のコミットの結果と並べて比較できる。
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # 標準出力を JSON だけにする
+
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+import pygame
+from game import Game
+from enemy import Enemy
+from boss import Boss
+from quality import QualityGovernor
+from display import Display, DisplayConfig
+from sounds import pre_init_mixer
+
+WIDTH = 800
+HEIGHT = 600
+PLAYER_HP = 10 ** 6  # シナリオの途中でゲームオーバーにならないようにする
+FIRE_INTERVAL = 6  # 射撃キーを押す間隔（フレーム）
+
+class Scenario:
+    """ゲームの初期状態を作る setup と、毎フレームの update 前に呼ぶ step の組"""
+    def __init__(self, name, setup, step=None, difficulty="normal"):
+        self.name = name
+        self.setup = setup
+        self.step = step
+        self.difficulty = difficulty
+
+def _press_fire(game, frame):
+    if frame % FIRE_INTERVAL == 0:
+        game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+
+def _keep_alive(game):
+    game.player.hp = game.player.max_hp = PLAYER_HP
+    game.boss_spawn_score = float("inf")  # ボス以外のシナリオではボスを出さない
+
+def _setup_max_spawn(game):
+    _keep_alive(game)
+    game.spawn_delay = 20  # 時間経過で下がる出現間隔の下限
+
+def _step_max_spawn(game, frame):
+    _press_fire(game, frame)
+
+def _setup_multishot(game):
+    _keep_alive(game)
+    game.spawn_delay = 10 ** 9  # 敵は step で補充する
+
+def _step_multishot(game, frame):
+    game.player.powerups["multi_shot"] = 600
+    # 倒された・画面外に出た敵を補充して常に 100 体にする
+    while len(game.enemies) < 100:
+        game.enemies.append(Enemy(random.randint(WIDTH // 2, WIDTH), random.randint(50, HEIGHT - 50)))
+    _press_fire(game, frame)
+
+def _boss_scenario(phase, pattern):
+    def setup(game):
+        _keep_alive(game)
+        boss = Boss(game.width, game.height, game.boss_hp_multiplier)
+        # フェーズが進んだのと同じ状態にする（HP はそのフェーズの範囲内）
+        boss.phase = phase
+        boss.current_phase_index = phase - 1
+        boss.speed += 0.5 * (phase - 1)
+        thresholds = [1.0] + boss.phase_thresholds
+        boss.hp = int(boss.max_hp * thresholds[phase - 1]) - 1
+        boss.current_pattern = pattern
+        game.boss = boss
+        game.enemies = []
+        game.formations = []
+        game.activation.clear()
+
+    def step(game, frame):
+        # パターンが切り替わらないようにタイマーを戻す（プレイヤーは撃たない）
+        if game.boss is not None:
+            game.boss.pattern_timer = 0
+            game.boss.current_pattern = pattern
+
+    return Scenario(f"boss_p{phase}_{pattern}", setup, step)
+
+def build_scenarios():
+    scenarios = [
+        Scenario("normal_max_spawn", _setup_max_spawn, _step_max_spawn),
+        Scenario("multishot_vs_100", _setup_multishot, _step_multishot)
+    ]
+    phase_patterns = Boss(WIDTH, HEIGHT).phase_patterns
+    for phase, patterns in sorted(phase_patterns.items()):
+        for pattern in patterns:
+            scenarios.append(_boss_scenario(phase, pattern))
+    return scenarios
+
+def summarize(times):
+    """ミリ秒のリストの平均・p50・p99・最大（FramePacer.stats と同じ位置のパーセンタイル）"""
+    times = sorted(times)
+    count = len(times)
+    return {
+        "mean_ms": sum(times) / count,
+        "p50_ms": times[count // 2],
+        "p99_ms": times[min(count - 1, int(count * 0.99))],
+        "max_ms": times[-1]
+    }
+
+def run_scenario(scenario, display, frames, warmup, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    game = Game(WIDTH, HEIGHT, scenario.difficulty, display=display)
+    try:
+        if game.sound_manager:
+            game.sound_manager.wait_until_loaded()
+        # 計測中に品質が変わると比較できないので最高品質に固定する
+        game.quality = QualityGovernor(budget_ms=float("inf"))
+        game._apply_quality()
+        scenario.setup(game)
+
+        update_times = []
+        render_times = []
+        entities = []
+        for frame in range(warmup + frames):
+            if scenario.step is not None:
+                scenario.step(game, frame)
+            pygame.event.pump()
+
+            start = time.perf_counter()
+            game.update()
+            middle = time.perf_counter()
+            game.render()
+            end = time.perf_counter()
+
+            if frame >= warmup:
+                update_times.append((middle - start) * 1000)
+                render_times.append((end - middle) * 1000)
+                entities.append(len(game.enemies) + len(game.player_bullets) + len(game.enemy_bullets))
+            if game.is_idle():
+                break
+    finally:
+        game.close()
+
+    if not update_times:
+        return {"error": "game ended during warmup"}
+    return {
+        "frames": len(update_times),
+        "update": summarize(update_times),
+        "render": summarize(render_times),
+        "frame": summarize([u + r for u, r in zip(update_times, render_times)]),
+        "entities_mean": sum(entities) / len(entities),
+        "entities_max": max(entities),
+        "completed": len(update_times) == frames
+    }
+
+def git_revision():
+    """現在のコミットのハッシュと、未コミットの変更があるか"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+def compare(result, baseline):
+    """2つの結果の平均と p99 を並べて表示"""
+    print(f"baseline {baseline.get('commit')} -> current {result.get('commit')}", file=sys.stderr)
+    print(f"{'scenario':<24}{'kind':>8}{'mean ms':>18}{'p99 ms':>18}", file=sys.stderr)
+    for name, stats in result["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None or "update" not in stats or "update" not in base:
+            continue
+        for kind in ("update", "render"):
+            cells = []
+            for key in ("mean_ms", "p99_ms"):
+                old, new = base[kind][key], stats[kind][key]
+                change = (new - old) / old * 100 if old else 0.0
+                cells.append(f"{new:7.2f} ({change:+5.1f}%)")
+            print(f"{name:<24}{kind:>8}{cells[0]:>18}{cells[1]:>18}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Scenario frame-time benchmark")
+    parser.add_argument("--frames", type=int, default=600, help="計測するフレーム数")
+    parser.add_argument("--warmup", type=int, default=60, help="計測前に捨てるフレーム数")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", nargs="+", default=["*"],
+                        help="実行するシナリオ名（fnmatch のパターン可）")
+    parser.add_argument("--output", help="結果の JSON を書き込むファイル（省略時は標準出力）")
+    parser.add_argument("--compare", help="比較する過去の結果の JSON")
+    parser.add_argument("--list", action="store_true", help="シナリオの一覧を表示して終了")
+    args = parser.parse_args()
+
+    pre_init_mixer()
+    pygame.init()
+    scenarios = [scenario for scenario in build_scenarios()
+                 if any(fnmatch.fnmatch(scenario.name, pattern) for pattern in args.scenario)]
+    if args.list:
+        for scenario in scenarios:
+            print(scenario.name)
+        return
+
+    display = Display(DisplayConfig(logical_size=(WIDTH, HEIGHT)))  # すべてのシナリオで共有する
+    commit, dirty = git_revision()
+    result = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "frames": args.frames,
+        "warmup": args.warmup,
+        "scenarios": {}
+    }
+    for scenario in scenarios:
+        print(f"running {scenario.name}...", file=sys.stderr)
+        result["scenarios"][scenario.name] = run_scenario(scenario, display, args.frames,
+                                                          args.warmup, args.seed)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
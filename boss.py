@@ -1,6 +1,7 @@
 import pygame
 import random
 import math
+from assets import charge_glow_frames, render_text
 
 class Boss:
     def __init__(self, screen_width, screen_height, hp_multiplier=1.0):
@@ -533,13 +534,9 @@ class Boss:
         
         # Draw special effects based on current pattern
         if self.current_pattern == "laser" and self.laser_charging >= 30:
-            # Draw charging effect
+            # Draw charging effect (pre-rendered frame for this charge level)
             charge_radius = (self.laser_charging - 30) / 2
-            charge_color = (255, 100, 100, 128)
-            
-            # Create a surface with alpha
-            charge_surface = pygame.Surface((charge_radius * 2, charge_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(charge_surface, charge_color, (charge_radius, charge_radius), charge_radius)
+            charge_surface = charge_glow_frames(30, 90)[self.laser_charging - 30]
             
             # Position charge effect
             charge_x = self.x - charge_radius
@@ -563,6 +560,21 @@ class Boss:
         # Draw HP bar
         self.draw_hp_bar(screen)
     
+    def get_draw_rects(self):
+        # 本体、HPバー、レーザーの充電エフェクトと光線の描画範囲
+        rects = [pygame.Rect(self.x - 2, self.y - 2, self.width + 4, self.height + 4),
+                 pygame.Rect(self.screen_width - 220, 20, 200, 20)]
+        if self.current_pattern == "laser" and self.laser_charging >= 30:
+            rects.append(pygame.Rect(self.x - 32, self.y + self.height // 2 - 32, 64, 64))
+            if self.laser_firing > 0:
+                rects.append(pygame.Rect(0, self.y + self.height // 2 - 16, self.x, 32))
+        return rects
+    
+    def add_glow(self, glow):
+        # コアのグロー（フェーズに応じた色）
+        glow.add(self._get_phase_color(), self.width // 2,
+                 self.x + self.width // 2, self.y + self.height // 2)
+    
     def _get_phase_color(self):
         # Core color changes with phase
         if self.phase == 1:
@@ -609,6 +621,5 @@ class Boss:
         pygame.draw.rect(screen, (200, 200, 200), (bar_x, bar_y, bar_width, bar_height), 2)
         
         # Draw text
-        font = pygame.font.SysFont(None, 24)
-        text = font.render(f"BOSS: {self.hp}/{self.max_hp} (Phase {self.phase})", True, (255, 255, 255))
+        text = render_text(24, f"BOSS: {self.hp}/{self.max_hp} (Phase {self.phase})", (255, 255, 255))
         screen.blit(text, (bar_x + 10, bar_y + 2))
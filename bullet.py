@@ -1,7 +1,88 @@
 import pygame
 import math
+import copy
+
+# 角度を量子化する刻み（度）
+ANGLE_STEP = 4
+
+# 描画済みスプライトのキャッシュ
+_missile_sprites = {}  # (色, 炎の有無, 角度の刻み) -> Surface
+_smoke_sprites = {}  # (直径, 透明度) -> Surface
+
+def _missile_points(cx, cy, width, height, angle):
+    """ミサイル本体と炎の頂点を計算"""
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
+    
+    # ミサイルの形状を定義（先端、胴体、後部）
+    body = [
+        (cx + width * cos_angle, cy + width * sin_angle),  # 先端
+        (cx + (width/2) * cos_angle - (height/2) * sin_angle, 
+         cy + (width/2) * sin_angle + (height/2) * cos_angle),  # 胴体上部
+        (cx - (width/2) * cos_angle - (height/2) * sin_angle, 
+         cy - (width/2) * sin_angle + (height/2) * cos_angle),  # 後部上部
+        (cx - (width/2) * cos_angle + (height/2) * sin_angle, 
+         cy - (width/2) * sin_angle - (height/2) * cos_angle),  # 後部下部
+        (cx + (width/2) * cos_angle + (height/2) * sin_angle, 
+         cy + (width/2) * sin_angle - (height/2) * cos_angle),  # 胴体下部
+    ]
+    flame = [
+        body[2],  # 後部上部
+        body[3],  # 後部下部
+        (cx - width * cos_angle, cy - width * sin_angle),  # 炎の先端
+    ]
+    inner_flame = [
+        (cx - (width/2) * cos_angle - (height/4) * sin_angle, 
+         cy - (width/2) * sin_angle + (height/4) * cos_angle),
+        (cx - (width/2) * cos_angle + (height/4) * sin_angle, 
+         cy - (width/2) * sin_angle - (height/4) * cos_angle),
+        (cx - (width*0.8) * cos_angle, cy - (width*0.8) * sin_angle),
+    ]
+    return body, flame, inner_flame
+
+def get_missile_sprite(color, flame, step, width, height):
+    """量子化した角度のミサイル画像を取得（初回のみ描画）"""
+    key = (color, flame, step)
+    sprite = _missile_sprites.get(key)
+    if sprite is None:
+        half = width + 1
+        sprite = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        body, flame_points, inner_flame_points = _missile_points(
+            half, half, width, height, math.radians(step * ANGLE_STEP))
+        pygame.draw.polygon(sprite, color, body)
+        
+        # ミサイルの後部に炎を描画（プレイヤーの弾のみ）
+        if flame:
+            pygame.draw.polygon(sprite, (255, 100, 0), flame_points)  # オレンジ色の炎
+            pygame.draw.polygon(sprite, (255, 200, 0), inner_flame_points)  # 黄色っぽい炎
+        _missile_sprites[key] = sprite
+    return sprite
+
+def get_smoke_sprite(diameter, alpha):
+    """煙パーティクルの画像を取得（初回のみ描画）"""
+    key = (diameter, alpha)
+    sprite = _smoke_sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((diameter, diameter), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (200, 200, 200, alpha),  # 灰色の煙
+                           (diameter // 2, diameter // 2), diameter // 2)
+        _smoke_sprites[key] = sprite
+    return sprite
+
+def draw_bullets(screen, bullet_groups):
+    """全ての弾を1回の blits 呼び出しでまとめて描画
+
+    bullet_groups は (弾のリスト, 色) の組のリスト（色が None なら弾の既定色）
+    """
+    items = []
+    for bullets, color in bullet_groups:
+        for bullet in bullets:
+            bullet.add_blit_items(items, color)
+    screen.blits(items, doreturn=False)
 
 class Bullet:
+    smoke_interval = 2  # 何フレームごとに煙を出すか（0 なら出さない。品質設定で変わる）
+    
     def __init__(self, x, y, speed_x, speed_y):
         self.x = x
         self.y = y
@@ -16,6 +97,11 @@ class Bullet:
             self.angle = math.atan2(speed_y, speed_x)
         else:
             self.angle = 0
+        self.angle_step = round(math.degrees(self.angle) / ANGLE_STEP) % (360 // ANGLE_STEP)
+        
+        # グレイズの判定（自機の周りの輪に入ると保留にし、当たらずに出たら1回だけ加点）
+        self.graze_pending = False
+        self.grazed = False  # 加点済み、または当たり判定に重なった
         
         # 煙のエフェクト用
         self.smoke_particles = []
@@ -28,7 +114,7 @@ class Bullet:
         
         # 煙のエフェクト更新
         self.smoke_timer += 1
-        if self.smoke_timer >= 2:  # 2フレームごとに煙を追加
+        if self.smoke_interval and self.smoke_timer >= self.smoke_interval:
             self.smoke_timer = 0
             # 弾の後ろに煙を追加
             angle = self.angle + math.pi  # 逆方向
@@ -51,66 +137,42 @@ class Bullet:
             if particle['life'] <= 0 or particle['size'] <= 0:
                 self.smoke_particles.remove(particle)
     
-    def draw(self, screen, color=None):
+    def get_draw_rects(self):
+        # ミサイル本体と煙の軌跡を含む描画範囲
+        half = self.width + 1
+        rect = pygame.Rect(int(self.x) - half, int(self.y) - half, half * 2, half * 2)
+        if self.smoke_particles:
+            oldest = self.smoke_particles[0]
+            rect.union_ip(pygame.Rect(int(oldest['x']) - 3, int(oldest['y']) - 3, 6, 6))
+        return [rect]
+    
+    def snapshot(self):
+        """描画用のコピー（煙のパーティクルは update で書き換えるため複製）"""
+        frozen = copy.copy(self)
+        frozen.smoke_particles = [dict(particle) for particle in self.smoke_particles]
+        return frozen
+    
+    def add_blit_items(self, items, color=None):
+        """描画用の (画像, 位置) を items に追加"""
         if color is None:
             color = self.color
         
-        # 煙のパーティクルを描画
+        # 煙のパーティクル
         for particle in self.smoke_particles:
             alpha = int(255 * (particle['life'] / 10))
-            smoke_color = (200, 200, 200, alpha)  # 灰色の煙
-            
-            # 透明度のある円を描画するための準備
-            smoke_surface = pygame.Surface((int(particle['size'] * 2), int(particle['size'] * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(smoke_surface, smoke_color, 
-                              (int(particle['size']), int(particle['size'])), 
-                              int(particle['size']))
-            
-            # 煙を描画
-            screen.blit(smoke_surface, 
-                       (int(particle['x'] - particle['size']), 
-                        int(particle['y'] - particle['size'])))
-        
-        # ミサイル本体を描画
-        # 回転した座標を計算
-        cos_angle = math.cos(self.angle)
-        sin_angle = math.sin(self.angle)
+            diameter = int(particle['size'] * 2)
+            if diameter > 0:
+                items.append((get_smoke_sprite(diameter, alpha),
+                              (int(particle['x'] - particle['size']),
+                               int(particle['y'] - particle['size']))))
         
-        # ミサイルの形状を定義（先端、胴体、後部）
-        points = [
-            (self.x + self.width * cos_angle, self.y + self.width * sin_angle),  # 先端
-            (self.x + (self.width/2) * cos_angle - (self.height/2) * sin_angle, 
-             self.y + (self.width/2) * sin_angle + (self.height/2) * cos_angle),  # 胴体上部
-            (self.x - (self.width/2) * cos_angle - (self.height/2) * sin_angle, 
-             self.y - (self.width/2) * sin_angle + (self.height/2) * cos_angle),  # 後部上部
-            (self.x - (self.width/2) * cos_angle + (self.height/2) * sin_angle, 
-             self.y - (self.width/2) * sin_angle - (self.height/2) * cos_angle),  # 後部下部
-            (self.x + (self.width/2) * cos_angle + (self.height/2) * sin_angle, 
-             self.y + (self.width/2) * sin_angle - (self.height/2) * cos_angle),  # 胴体下部
-        ]
-        
-        # ミサイル本体を描画
-        pygame.draw.polygon(screen, color, points)
-        
-        # ミサイルの後部に炎を描画（プレイヤーの弾のみ）
-        if color == self.color:  # プレイヤーの弾の場合
-            flame_color = (255, 100, 0)  # オレンジ色の炎
-            flame_points = [
-                (self.x - (self.width/2) * cos_angle - (self.height/2) * sin_angle, 
-                 self.y - (self.width/2) * sin_angle + (self.height/2) * cos_angle),  # 後部上部
-                (self.x - (self.width/2) * cos_angle + (self.height/2) * sin_angle, 
-                 self.y - (self.width/2) * sin_angle - (self.height/2) * cos_angle),  # 後部下部
-                (self.x - self.width * cos_angle, self.y - self.width * sin_angle),  # 炎の先端
-            ]
-            pygame.draw.polygon(screen, flame_color, flame_points)
-            
-            # 内側の炎（より明るい色）
-            inner_flame_color = (255, 200, 0)  # 黄色っぽい炎
-            inner_flame_points = [
-                (self.x - (self.width/2) * cos_angle - (self.height/4) * sin_angle, 
-                 self.y - (self.width/2) * sin_angle + (self.height/4) * cos_angle),
-                (self.x - (self.width/2) * cos_angle + (self.height/4) * sin_angle, 
-                 self.y - (self.width/2) * sin_angle - (self.height/4) * cos_angle),
-                (self.x - (self.width*0.8) * cos_angle, self.y - (self.width*0.8) * sin_angle),
-            ]
-            pygame.draw.polygon(screen, inner_flame_color, inner_flame_points)
+        # ミサイル本体（プレイヤーの弾は炎付き）
+        sprite = get_missile_sprite(color, color == self.color, self.angle_step,
+                                    self.width, self.height)
+        half = self.width + 1
+        items.append((sprite, (int(self.x) - half, int(self.y) - half)))
+    
+    def draw(self, screen, color=None):
+        items = []
+        self.add_blit_items(items, color)
+        screen.blits(items, doreturn=False)
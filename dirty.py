@@ -0,0 +1,49 @@
+import pygame
+
+class DirtyRectTracker:
+    """前フレームと今フレームの描画範囲を記録し、変化した領域だけを消去・更新する"""
+    def __init__(self, width, height, threshold=0.5, max_rects=300):
+        self.screen_rect = pygame.Rect(0, 0, width, height)
+        self.threshold_area = width * height * threshold  # これを超えたら全画面更新
+        self.max_rects = max_rects
+        self.previous = []
+        self.current = []
+        self.full = True  # 最初のフレームは全画面更新
+
+    def force_full(self):
+        """次のフレームを全画面更新にする（画面全体が変わった場合など）"""
+        self.full = True
+
+    def begin(self, rects):
+        """今フレームの描画範囲を登録し、全画面更新にするかを決める"""
+        self.current = []
+        for rect in rects:
+            self.add(rect)
+        if not self.full:
+            # 前フレームと同じ矩形は重複して数えない
+            dirty = set(map(tuple, self.previous + self.current))
+            if (len(dirty) > self.max_rects or
+                    sum(width * height for _, _, width, height in dirty) > self.threshold_area):
+                self.full = True
+        return self.full
+
+    def add(self, rect):
+        rect = self.screen_rect.clip(rect)
+        if rect.width > 0 and rect.height > 0:
+            self.current.append(rect)
+
+    def clear(self, surface, color):
+        """前フレームに描画した領域だけを背景色で消去"""
+        if self.full:
+            surface.fill(color)
+        else:
+            for rect in self.previous:
+                surface.fill(color, rect)
+
+    def finish(self):
+        """今フレームの描画を確定し、更新する矩形のリストを返す（全画面更新なら None）"""
+        rects = None if self.full else list(set(map(tuple, self.previous + self.current)))
+        self.previous = self.current
+        self.current = []
+        self.full = False
+        return rects
@@ -0,0 +1,178 @@
+import pygame
+import json
+import math
+import time
+from collections import deque
+
+class DisplayConfig:
+    """表示とフレームペーシングの設定（コマンドラインまたは JSON 設定ファイルから指定）"""
+    defaults = {
+        "logical_size": (800, 600),
+        "window_size": None,
+        "fullscreen": False,
+        "scale_mode": "scaled",  # "scaled" (pygame.SCALED) または "software" (transform.scale)
+        "vsync": False,
+        "doublebuf": False,
+        "pacing": "sleep",  # "sleep" (Clock.tick) または "busy" (Clock.tick_busy_loop)
+        "fps": 60,
+        "frame_stats": False  # 終了時にフレーム時間の統計を表示
+    }
+
+    def __init__(self, **options):
+        unknown = set(options) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Unknown display options: {', '.join(sorted(unknown))}")
+        for name, default in self.defaults.items():
+            setattr(self, name, options.get(name, default))
+        if self.scale_mode not in ("scaled", "software"):
+            raise ValueError(f"Unknown scale mode: {self.scale_mode}")
+        if self.pacing not in ("sleep", "busy"):
+            raise ValueError(f"Unknown pacing mode: {self.pacing}")
+        self.logical_size = tuple(self.logical_size)
+        if self.window_size is not None:
+            self.window_size = tuple(self.window_size)
+
+    @classmethod
+    def load(cls, path, **overrides):
+        """JSON 設定ファイルを読み込む（overrides の値が優先、None は未指定扱い）"""
+        options = {}
+        if path:
+            with open(path, encoding="utf-8") as f:
+                options.update(json.load(f))
+        options.update({name: value for name, value in overrides.items() if value is not None})
+        return cls(**options)
+
+    def describe(self):
+        """統計と一緒に表示する設定の要約"""
+        return (f"scale={self.scale_mode} vsync={'on' if self.vsync else 'off'} "
+                f"doublebuf={'on' if self.doublebuf else 'off'} "
+                f"fullscreen={'on' if self.fullscreen else 'off'} pacing={self.pacing}")
+
+class Display:
+    """固定の論理解像度で描画し、ウィンドウやフルスクリーンの大きさに拡大して表示する
+
+    scale_mode が "scaled" のときは pygame.SCALED で SDL に拡大を任せ、
+    "software" のときはオフスクリーンの描画面を transform.scale で1回だけ拡大する。
+    display.set_mode を呼ぶのはここだけで、起動時に1回だけ作成する。
+    """
+    def __init__(self, config=None):
+        if config is None:
+            config = DisplayConfig()
+        self.config = config
+        self.logical_size = config.logical_size
+
+        flags = 0
+        if config.fullscreen:
+            flags |= pygame.FULLSCREEN
+        if config.doublebuf:
+            flags |= pygame.DOUBLEBUF
+        vsync = 1 if config.vsync else 0
+        if config.vsync and config.scale_mode != "scaled":
+            # pygame では vsync は SCALED（または OPENGL）と組み合わせたときのみ有効
+            print("vsync requires the 'scaled' mode; ignoring vsync")
+            config.vsync = False
+            vsync = 0
+
+        if config.scale_mode == "scaled":
+            # 表示面は論理解像度のまま、拡大は SDL 側で行う
+            self.window = pygame.display.set_mode(self.logical_size, flags | pygame.SCALED, vsync=vsync)
+            self.surface = self.window
+        else:
+            if config.fullscreen:
+                size = (0, 0)  # デスクトップの解像度
+            else:
+                size = config.window_size or self.logical_size
+            self.window = pygame.display.set_mode(size, flags, vsync=vsync)
+            if self.window.get_size() == self.logical_size:
+                self.surface = self.window
+            else:
+                self.surface = pygame.Surface(self.logical_size).convert()
+
+    @property
+    def width(self):
+        return self.logical_size[0]
+
+    @property
+    def height(self):
+        return self.logical_size[1]
+
+    @property
+    def supports_partial_update(self):
+        """display.update(rects) で部分更新できるか（拡大描画中は全画面のみ）"""
+        return self.surface is self.window
+
+    def to_logical(self, pos):
+        """ウィンドウ座標を論理座標に変換"""
+        if self.surface is self.window:
+            return pos
+        window_width, window_height = self.window.get_size()
+        return (pos[0] * self.logical_size[0] // window_width,
+                pos[1] * self.logical_size[1] // window_height)
+
+    def present(self, rects=None):
+        """描画内容を表示（rects を渡すとその範囲だけ更新）"""
+        if self.surface is not self.window:
+            pygame.transform.scale(self.surface, self.window.get_size(), self.window)
+            pygame.display.flip()
+        elif rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+class FramePacer:
+    """フレームレートを制御し、実際のフレーム間隔を記録する"""
+    def __init__(self, fps=60, pacing="sleep", history=3600):
+        self.fps = fps
+        self.pacing = pacing
+        self.clock = pygame.time.Clock()
+        self.frame_times = deque(maxlen=history)  # ミリ秒
+        self.last_time = None
+
+    def tick(self):
+        """次のフレームまで待機し、前のフレームからの経過時間（ミリ秒）を返す"""
+        if self.pacing == "busy":
+            self.clock.tick_busy_loop(self.fps)
+        else:
+            self.clock.tick(self.fps)
+        now = time.perf_counter()
+        frame_time = None
+        if self.last_time is not None:
+            frame_time = (now - self.last_time) * 1000
+            self.frame_times.append(frame_time)
+        self.last_time = now
+        return frame_time
+
+    def reset(self):
+        """待機画面などで止まっていた時間を統計に含めないようにする"""
+        self.clock.tick()
+        self.last_time = None
+
+    def stats(self):
+        """フレーム時間の統計（平均、標準偏差、パーセンタイル、連続フレーム間の揺らぎ）"""
+        times = sorted(self.frame_times)
+        if not times:
+            return None
+        count = len(times)
+        mean = sum(times) / count
+        variance = sum((t - mean) ** 2 for t in times) / count
+        ordered = list(self.frame_times)
+        jitter = (sum(abs(b - a) for a, b in zip(ordered, ordered[1:])) / (count - 1)) if count > 1 else 0.0
+        return {
+            "frames": count,
+            "target_ms": 1000 / self.fps,
+            "mean_ms": mean,
+            "stdev_ms": math.sqrt(variance),
+            "p50_ms": times[count // 2],
+            "p99_ms": times[min(count - 1, int(count * 0.99))],
+            "max_ms": times[-1],
+            "jitter_ms": jitter
+        }
+
+    def summary(self, description=""):
+        stats = self.stats()
+        if stats is None:
+            return "No frames recorded"
+        return (f"[{description}] frames={stats['frames']} target={stats['target_ms']:.2f}ms "
+                f"mean={stats['mean_ms']:.2f}ms stdev={stats['stdev_ms']:.2f}ms "
+                f"p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+                f"max={stats['max_ms']:.2f}ms jitter={stats['jitter_ms']:.2f}ms")
@@ -18,6 +18,7 @@ class Enemy:
         self.direction = 1  # For zigzag pattern
         self.zigzag_counter = 0  # For zigzag pattern
         self.original_y = y  # Store original y position for patterns
+        self.formation = None  # 編隊に所属していない
     
     def update(self):
         # Move left
@@ -36,6 +37,9 @@ class Enemy:
                 self.zigzag_counter = 0
             self.y += self.direction * (self.speed / 2)
     
+    def get_draw_rects(self):
+        return [pygame.Rect(self.x - 1, self.y - 1, self.width + 2, self.height + 2)]
+    
     def draw(self, screen):
         # Draw enemy ship (circular with details)
         pygame.draw.circle(screen, self.color, (self.x + self.width // 2, self.y + self.height // 2), 
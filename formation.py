@@ -0,0 +1,159 @@
+import random
+import math
+import numpy as np
+from enemy import Enemy
+
+class FormationMember(Enemy):
+    """編隊に所属する敵（位置は Formation の配列から読み出す）"""
+    def __init__(self, formation, index):
+        self.formation = formation
+        self.index = index
+        self.width = 20
+        self.height = 20
+        self.speed = formation.speed
+        self.color = (255, 120, 0)  # Orange (編隊の敵)
+        self.move_pattern = "formation"
+
+    @property
+    def x(self):
+        return self.formation.positions[self.index, 0]
+
+    @x.setter
+    def x(self, value):
+        self.formation.positions[self.index, 0] = value
+
+    @property
+    def y(self):
+        return self.formation.positions[self.index, 1]
+
+    @y.setter
+    def y(self, value):
+        self.formation.positions[self.index, 1] = value
+
+    def update(self):
+        # 移動は Formation.update でまとめて計算済み
+        pass
+
+    def snapshot(self):
+        """描画用のコピー（位置は編隊の配列から切り離して通常の敵として持つ）"""
+        frozen = Enemy.__new__(Enemy)
+        frozen.__dict__.update(self.__dict__)
+        frozen.x = float(self.x)
+        frozen.y = float(self.y)
+        return frozen
+
+class Formation:
+    """共通の軌道を1回だけ評価し、メンバーの位置をオフセット加算で求める編隊"""
+    shapes = ["v", "snake", "ring"]
+    size_ranges = {
+        "v": (10, 20),
+        "snake": (10, 30),
+        "ring": (12, 24)
+    }
+
+    def __init__(self, x, screen_height, shape=None, count=None, speed=2):
+        self.shape = shape if shape is not None else random.choice(self.shapes)
+        if count is None:
+            count = random.randint(*self.size_ranges[self.shape])
+        self.count = max(1, min(50, count))
+        self.speed = speed
+        self.screen_height = screen_height
+        self.timer = 0
+
+        # Path parameters (shared by every member)
+        self.amplitude = random.randint(20, 60)
+        self.frequency = random.uniform(0.02, 0.04)
+        self.spacing = 24
+
+        # オフセットと位置は (count, 2) の配列で保持
+        self.offsets = self._build_offsets()
+        self.positions = np.empty((self.count, 2))
+        self.alive = np.ones(self.count, dtype=bool)
+        self.awake = np.zeros(self.count, dtype=bool)  # ビューポート付近に入ったメンバー
+
+        # 画面内に収まる範囲で基準位置を決める
+        member_height = 20
+        extent = np.abs(self.offsets[:, 1]).max() + self.amplitude
+        low = extent + 20
+        high = max(low, screen_height - extent - member_height - 20)
+        self.origin_x = x + max(0.0, -self.offsets[:, 0].min())
+        self.origin_y = random.uniform(low, high)
+
+        self.members = [FormationMember(self, i) for i in range(self.count)]
+        self._evaluate()
+
+    def _build_offsets(self):
+        """編隊の形状に応じたメンバーごとのオフセットを作成"""
+        index = np.arange(self.count)
+        offsets = np.zeros((self.count, 2))
+        if self.shape == "v":
+            # 先頭から左右（上下）の翼に交互に並べる
+            arm = (index + 1) // 2
+            side = np.where(index % 2 == 1, -1, 1)
+            offsets[:, 0] = arm * self.spacing
+            offsets[:, 1] = side * arm * (self.spacing * 0.75)
+        elif self.shape == "snake":
+            offsets[:, 0] = index * self.spacing
+        elif self.shape == "ring":
+            radius = max(40.0, self.count * self.spacing / (2 * math.pi))
+            angles = index * (2 * math.pi / self.count)
+            offsets[:, 0] = np.cos(angles) * radius
+            offsets[:, 1] = np.sin(angles) * radius
+        return offsets
+
+    def _evaluate(self):
+        """軌道を1回評価し、全メンバーの位置をまとめて計算"""
+        t = self.timer
+        head_x = self.origin_x - self.speed * t
+        head_y = self.origin_y
+
+        if self.shape == "v":
+            head_y += self.amplitude * math.sin(self.frequency * t)
+            self.positions[:] = self.offsets
+            self.positions[:, 0] += head_x
+            self.positions[:, 1] += head_y
+        elif self.shape == "snake":
+            # 後続のメンバーは同じ波形を位相遅れで辿る
+            phase = self.frequency * t
+            self.positions[:, 0] = head_x + self.offsets[:, 0]
+            self.positions[:, 1] = head_y + self.amplitude * np.sin(
+                phase - self.frequency * self.offsets[:, 0] / self.speed)
+        elif self.shape == "ring":
+            # リングは回転しながら進む
+            angle = self.frequency * t
+            cos_a = math.cos(angle)
+            sin_a = math.sin(angle)
+            self.positions[:, 0] = head_x + self.offsets[:, 0] * cos_a - self.offsets[:, 1] * sin_a
+            self.positions[:, 1] = head_y + self.offsets[:, 0] * sin_a + self.offsets[:, 1] * cos_a
+
+    @property
+    def x(self):
+        # 編隊の先端（最も左のメンバー）
+        return self.positions[:, 0].min()
+
+    @x.setter
+    def x(self, value):
+        self.origin_x += value - self.x
+        self._evaluate()
+
+    def update(self):
+        self.timer += 1
+        self._evaluate()
+
+    def wake_members(self, wake_x):
+        """wake_x より左に入ってきたメンバーを起こして返す"""
+        woken = ~self.awake & self.alive & (self.positions[:, 0] <= wake_x)
+        if not woken.any():
+            return []
+        self.awake |= woken
+        return [self.members[i] for i in np.flatnonzero(woken)]
+
+    def release(self, member):
+        """撃破または画面外に出たメンバーを編隊から外す"""
+        self.alive[member.index] = False
+
+    def is_finished(self):
+        # 生存メンバーがいないか、全員が画面左端を越えたら終了
+        if not self.alive.any():
+            return True
+        return self.positions[self.alive, 0].max() < -self.members[0].width
@@ -1,19 +1,35 @@
 import pygame
 import random
 import math
+import time
+from itertools import compress
 from player import Player
 from enemy import Enemy
+from formation import Formation
 from bullet import Bullet
 from boss import Boss
 from powerup import PowerUp
 from sounds import SoundManager
+from terrain import Terrain
+from activation import ActivationZone
+from starfield import Starfield
+from quality import QualityGovernor
+from renderer import Renderer
+from snapshot import FrameSnapshot, HudState, freeze, freeze_all
+from profiler import FrameProfiler
+from display import Display, DisplayConfig
+from spatial import centers, flag_mask, within_radius, overlap_box, split_by_mask
 
 class Game:
-    def __init__(self, width, height, difficulty="normal"):
+    def __init__(self, width, height, difficulty="normal", dirty_rendering=False, display=None,
+                 glow_quality="high", profiler=None, fps=60, render_thread=False):
+        # width, height は論理解像度（ゲームのロジックはすべてこの座標系で動く）
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
-        pygame.display.set_caption("Horizontal Shooter")
+        if display is None:
+            display = Display(DisplayConfig(logical_size=(width, height)))
+            pygame.display.set_caption("Horizontal Shooter")
+        self.display = display
         
         # 難易度設定
         self.difficulty = difficulty
@@ -22,17 +38,27 @@ class Game:
         # Game objects
         self.player = Player(50, height // 2)
         self.enemies = []
+        self.formations = []  # 編隊（メンバーは self.enemies にも含まれる）
         self.player_bullets = []
         self.enemy_bullets = []
         self.powerups = []
         self.hit_effects = []  # ヒットエフェクト用リスト
+        self.terrain = Terrain(width, height)  # スクロールする地形
+        self.activation = ActivationZone(width, margin=100)  # 画面外で休止中のエンティティ
+        self.spawn_lead = 60  # 出現位置を休止ゾーンの境界からこれだけ奥に置く（地形のスクロール量）
+        self.bombs = []  # 爆発中のボム
         
         # Game state
         self.score = 0
         self.game_over = False
         self.game_cleared = False
+        self.paused = False  # ウィンドウのフォーカスが外れている間は一時停止
+        self.graze_count = 0
+        self.graze_distance = 20  # 当たり判定からこの距離以内をかすめたらグレイズ
+        self.graze_points = 1
         self.spawn_timer = 0
         self.spawn_delay = self.base_spawn_delay  # 難易度に応じて設定
+        self.formation_chance = 0.05  # 出現時に編隊になる確率
         
         # Powerup spawn settings
         self.powerup_timer = 0
@@ -45,7 +71,7 @@ class Game:
         
         # Sound manager
         try:
-            self.sound_manager = SoundManager()
+            self.sound_manager = SoundManager(pan_width=width)
             # Don't try to play music right away, wait until sounds are generated
         except Exception as e:
             print(f"Error initializing sound manager: {e}")
@@ -54,8 +80,30 @@ class Game:
         # Load background
         self.bg_color = (0, 0, 50)  # Dark blue background
         
-        # Load fonts
-        self.font = pygame.font.SysFont(None, 36)
+        # Parallax starfield (差分矩形描画では背景が静止している必要があるため使わない)
+        self.starfield = None if dirty_rendering else Starfield(width, height, self.bg_color)
+        
+        # フレーム時間に応じて見た目の負荷を調整する（ゲームの進行には影響しない）
+        # 描画時間は画面の更新（垂直同期の待ち）を含めずに計測する
+        self.fps = fps
+        self.quality = QualityGovernor(budget_ms=1000 / fps)
+        self.update_ms = 0.0
+        self.render_ms = 0.0
+        self.show_debug = False  # F3 でデバッグ表示を切り替え
+        
+        # 区間ごとの処理時間（F4 でオーバーレイを切り替え。無効なときはほとんど負荷がない）
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        
+        # 描画（差分矩形・グロー・静止画面の画像などの描画用の状態は Renderer が持つ）
+        # 描画スレッドを使う場合は専用の描画面に描き、表示のときに Display の描画面へ写す
+        self.dirty_rendering = dirty_rendering
+        self.glow_quality = glow_quality
+        self.render_thread = render_thread
+        surface = display.surface.copy() if render_thread else display.surface
+        self.renderer = Renderer(surface, dirty_rendering, glow_quality, self.bg_color, self.profiler)
+        self.redraw_count = 0  # invalidate の回数（スナップショットで描画側に伝える）
+        
+        self._apply_quality()
     
     def _apply_difficulty_settings(self):
         """難易度に応じたゲーム設定を適用"""
@@ -96,11 +144,13 @@ class Game:
                     self.player_bullets.append(bullet)
                 
                 # Play sound
-                if self.sound_manager:
-                    try:
-                        self.sound_manager.play_sound('shoot')
-                    except Exception as e:
-                        pass  # Silently ignore sound errors
+                self._queue_sound('shoot', self.player.x)
+                
+            elif event.key == pygame.K_F3:
+                self.show_debug = not self.show_debug
+                
+            elif event.key == pygame.K_F4:
+                self.profiler.toggle_overlay()
                 
             elif event.key == pygame.K_r and (self.game_over or self.game_cleared):
                 # ゲームクリア時はメインメニューに戻る
@@ -108,23 +158,137 @@ class Game:
                     return "menu"
                 else:
                     # ゲームオーバー時は同じ難易度で再開
-                    self.__init__(self.width, self.height, self.difficulty)
+                    self._restart()
                     return None
         
         return None
     
+    def close(self):
+        """BGM の合成スレッドを止める（ゲームを破棄する前に呼ぶ）"""
+        if self.sound_manager:
+            try:
+                self.sound_manager.close()
+            except Exception:
+                pass
+    
+    def _restart(self):
+        """同じ難易度と表示設定でゲームをやり直す"""
+        self.close()
+        show_debug = self.show_debug
+        self.__init__(self.width, self.height, self.difficulty, self.dirty_rendering, self.display,
+                      self.glow_quality, self.profiler, self.fps, self.render_thread)
+        self.show_debug = show_debug
+    
+    def _update_music(self):
+        """ボスのフェーズとプレイヤーの残りHPで BGM の強さを決め、次のチャンクを予約"""
+        if not self.sound_manager:
+            return
+        intensity = self.boss.phase - 1 if self.boss is not None else 0
+        if self.player.hp <= 1:
+            intensity = min(3, intensity + 1)
+        try:
+            self.sound_manager.set_music_intensity(intensity)
+            self.sound_manager.update()
+        except Exception:
+            pass  # Silently ignore sound errors
+    
+    def _queue_sound(self, sound_name, x=None):
+        """効果音を予約（同じフレームの同じ効果音は1回だけ鳴らす。x は定位に使う画面上の横位置）"""
+        if self.sound_manager:
+            self.sound_manager.queue_sound(sound_name, x)
+    
+    def _apply_quality(self):
+        """現在の品質レベルの設定を反映"""
+        settings = self.quality.settings
+        Bullet.smoke_interval = settings["smoke_interval"]
+        self.player.shield_ripples = settings["shield_ripples"]
+        # グローとヒットエフェクトの設定はスナップショットで描画側に渡す
+    
+    def is_idle(self):
+        """画面が静止している（ゲームオーバー・クリア・一時停止中）か"""
+        return self.game_over or self.game_cleared or self.paused
+    
+    def set_paused(self, paused):
+        self.paused = paused
+    
+    def invalidate(self):
+        """次の描画で画面全体を描き直す（ウィンドウの再表示時など）"""
+        self.redraw_count += 1
+    
     def update(self):
-        if self.game_over or self.game_cleared:
+        # BGM は一時停止中やゲームオーバー中も流し続ける
+        self._update_music()
+        
+        if self.is_idle():
             return
-            
+        
+        start = time.perf_counter()
+        self._update_world()
+        self.update_ms = (time.perf_counter() - start) * 1000
+        self.profiler.end_update(self.entity_counts())
+        
+        # このフレームの効果音をまとめて再生
+        if self.sound_manager:
+            try:
+                self.sound_manager.flush_sounds()
+            except Exception:
+                pass  # Silently ignore sound errors
+        
+        # 直前の描画時間と合わせたフレーム時間で品質を調整
+        if self.quality.record(self.update_ms + self.render_ms):
+            self._apply_quality()
+    
+    def entity_counts(self):
+        return {
+            "enemies": len(self.enemies),
+            "player_bullets": len(self.player_bullets),
+            "enemy_bullets": len(self.enemy_bullets),
+            "powerups": len(self.powerups),
+            "hit_effects": len(self.hit_effects)
+        }
+    
+    def describe_state(self):
+        """プロファイルの記録用に、現在のボスのフェーズとパターン、エンティティ数を返す"""
+        state = {
+            "score": self.score,
+            "difficulty": self.difficulty,
+            "boss_phase": self.boss.phase if self.boss is not None else None,
+            "boss_pattern": self.boss.current_pattern if self.boss is not None else None,
+            "quality": self.quality.level
+        }
+        state.update(self.entity_counts())
+        return state
+    
+    def _update_world(self):
+        mark = self.profiler.update.mark
+        
         # Update player
+        mark("player")
         keys = pygame.key.get_pressed()
         self.player.update(keys, self.width, self.height)
         
+        # Scroll background and terrain, and check collision with player
+        if self.starfield is not None:
+            self.starfield.update()
+        self.terrain.update()
+        center_x, center_y = self.player.get_hitbox_center()
+        radius = self.player.hitbox_radius
+        if (self.terrain.collide_rect(center_x - radius, center_y - radius, radius * 2, radius * 2)
+                and not self.player.has_shield()):
+            game_over = self.player.take_damage()
+            if game_over:
+                self.game_over = True
+            
+            self._create_hit_effect(center_x, center_y)
+            
+            self._queue_sound('explosion', center_x)
+        
         # Update hit effects
+        mark("effects")
         self._update_hit_effects()
         
         # Start BGM if not already playing
+        mark("spawning")
         if self.sound_manager and not self.sound_manager.current_music:
             try:
                 self.sound_manager.play_music('bgm')
@@ -136,10 +300,12 @@ class Game:
             self.boss = Boss(self.width, self.height, self.boss_hp_multiplier)
             # Stop spawning regular enemies when boss appears
             self.enemies = []
+            self.formations = []
+            self.activation.clear()
             # Play boss appear sound
+            self._queue_sound('boss_appear')
             if self.sound_manager:
                 try:
-                    self.sound_manager.play_sound('boss_appear')
                     self.sound_manager.play_music('boss_bgm')
                 except Exception:
                     pass  # Silently ignore sound errors
@@ -150,25 +316,35 @@ class Game:
             self.powerup_timer = 0
             # Only spawn powerups during regular gameplay (not during boss fight)
             if self.boss is None:
-                x = self.width
+                x = self._spawn_x()
                 y = random.randint(50, self.height - 50)
                 powerup = PowerUp(x, y)
-                self.powerups.append(powerup)
+                self._stage("powerup", powerup)
         
         # Spawn regular enemies (only if boss is not present)
         if self.boss is None:
             self.spawn_timer += 1
             if self.spawn_timer >= self.spawn_delay:
                 self.spawn_timer = 0
-                y = random.randint(50, self.height - 50)
-                enemy = Enemy(self.width, y)
-                self.enemies.append(enemy)
+                if random.random() < self.formation_chance:
+                    # 編隊で出現
+                    formation = Formation(self._spawn_x(), self.height)
+                    self._stage("formation", formation)
+                else:
+                    y = random.randint(50, self.height - 50)
+                    enemy = Enemy(self._spawn_x(), y)
+                    self._stage("enemy", enemy)
                 
                 # Increase difficulty over time
                 if self.spawn_delay > 20:
                     self.spawn_delay -= 1
         
+        # Wake staged entities approaching the viewport
+        for kind, entity in self.activation.wake(self.terrain.scroll_x):
+            self._activate(kind, entity)
+        
         # Update powerups
+        mark("powerups")
         for powerup in self.powerups[:]:
             powerup.update()
             
@@ -182,13 +358,12 @@ class Game:
                 message = powerup.apply_effect(self.player)
                 self.player.set_powerup_message(message)
                 self.powerups.remove(powerup)
-                if self.sound_manager:
-                    try:
-                        self.sound_manager.play_sound('powerup')
-                    except Exception:
-                        pass
+                if powerup.type == "bomb":
+                    self._detonate_bomb(*self.player.get_hitbox_center())
+                self._queue_sound('powerup', powerup.x)
         
         # Update boss
+        mark("boss")
         if self.boss is not None:
             self.boss.update()
             
@@ -206,11 +381,16 @@ class Game:
                 if game_over:
                     self.game_over = True
                 
-                if self.sound_manager:
-                    try:
-                        self.sound_manager.play_sound('explosion')
-                    except Exception:
-                        pass
+                self._queue_sound('explosion', self.player.x)
+        
+        # Update formations (軌道は編隊ごとに1回だけ評価)
+        mark("enemies")
+        for formation in self.formations[:]:
+            formation.update()
+            # ビューポート付近に入ったメンバーだけを更新対象にする
+            self.enemies.extend(formation.wake_members(self.activation.wake_x))
+            if formation.is_finished():
+                self.formations.remove(formation)
         
         # Update regular enemies
         for enemy in self.enemies[:]:
@@ -218,7 +398,7 @@ class Game:
             
             # Remove enemies that are off-screen
             if enemy.x < -enemy.width:
-                self.enemies.remove(enemy)
+                self._remove_enemy(enemy)
                 continue
                 
             # Enemy shoots randomly - 難易度に応じた確率で発射
@@ -233,13 +413,10 @@ class Game:
                 if game_over:
                     self.game_over = True
                 
-                if self.sound_manager:
-                    try:
-                        self.sound_manager.play_sound('explosion')
-                    except Exception:
-                        pass
+                self._queue_sound('explosion', self.player.x)
         
         # Update player bullets
+        mark("player_bullets")
         for bullet in self.player_bullets[:]:
             bullet.update()
             
@@ -253,36 +430,19 @@ class Game:
                 self.player_bullets.remove(bullet)
                 # 難易度に応じたダメージを与える
                 boss_defeated = self.boss.take_damage(10 * self.player_damage_multiplier)
-                if self.sound_manager:
-                    try:
-                        self.sound_manager.play_sound('boss_hit')
-                    except Exception:
-                        pass
+                self._queue_sound('boss_hit', bullet.x)
                 
                 if boss_defeated:
-                    self.boss = None
-                    self.boss_defeated = True
-                    self.game_cleared = True  # ゲームクリア状態に設定
-                    self.score += 100  # Extra points for defeating boss
-                    if self.sound_manager:
-                        try:
-                            self.sound_manager.play_sound('boss_defeat')
-                            self.sound_manager.play_music('bgm')  # Return to normal music
-                        except Exception:
-                            pass
+                    self._defeat_boss()
                 break
                 
             # Check collision with regular enemies
             for enemy in self.enemies[:]:
                 if self.check_collision(bullet, enemy):
                     self.player_bullets.remove(bullet)
-                    self.enemies.remove(enemy)
+                    self._remove_enemy(enemy)
                     self.score += 10
-                    if self.sound_manager:
-                        try:
-                            self.sound_manager.play_sound('explosion')
-                        except Exception:
-                            pass
+                    self._queue_sound('explosion', enemy.x)
                     
                     # Chance to spawn powerup when enemy is destroyed
                     if random.random() < 0.1:  # 10% chance
@@ -292,17 +452,22 @@ class Game:
                     break
         
         # Update enemy bullets
+        mark("enemy_bullets")
         for bullet in self.enemy_bullets[:]:
             bullet.update()
             
             # Remove bullets that are off-screen
             if bullet.x < 0:
+                if bullet.graze_pending:
+                    self._add_grazes(1)  # 当たらずに画面外へ出た
                 self.enemy_bullets.remove(bullet)
                 continue
                 
             # Check collision with player
             if self.check_collision(bullet, self.player) and not self.player.has_shield():
                 self.enemy_bullets.remove(bullet)
+                bullet.graze_pending = False  # 当たった弾はグレイズにしない
+                bullet.grazed = True
                 
                 # プレイヤーがダメージを受ける
                 game_over = self.player.take_damage()
@@ -313,83 +478,89 @@ class Game:
                 self._create_hit_effect(self.player.x + self.player.width // 2, 
                                        self.player.y + self.player.height // 2)
                 
-                if self.sound_manager:
-                    try:
-                        self.sound_manager.play_sound('explosion')
-                    except Exception:
-                        pass
-    
-    def render(self):
-        # Clear screen
-        self.screen.fill(self.bg_color)
-        
-        # Draw player
-        self.player.draw(self.screen)
-        
-        # Draw boss
-        if self.boss is not None:
-            self.boss.draw(self.screen)
-        
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
-        
-        # Draw powerups
-        for powerup in self.powerups:
-            powerup.draw(self.screen)
-        
-        # Draw bullets
-        for bullet in self.player_bullets:
-            bullet.draw(self.screen)
-            
-        for bullet in self.enemy_bullets:
-            bullet.draw(self.screen, (255, 0, 0))  # Red for enemy bullets
-        
-        # Draw hit effects
-        self._draw_hit_effects(self.screen)
-        
-        # Draw score and difficulty
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (10, 10))
+                self._queue_sound('explosion', self.player.x)
         
-        difficulty_text = self.font.render(f"Difficulty: {self.difficulty.capitalize()}", True, (255, 255, 255))
-        self.screen.blit(difficulty_text, (10, 40))
+        # Remove bullets that hit the terrain
+        self.player_bullets = self._remove_terrain_hits(self.player_bullets)
+        self.enemy_bullets = self._remove_terrain_hits(self.enemy_bullets)
         
-        # Draw powerup status
-        self._draw_powerup_status()
+        # Check grazes
+        self._check_grazes()
         
-        # Draw boss approaching message
-        if self.boss_spawn_score - self.score <= 50 and self.boss is None and not self.boss_defeated:
-            warning_text = self.font.render("WARNING: Boss approaching!", True, (255, 50, 50))
-            text_rect = warning_text.get_rect(center=(self.width // 2, 50))
-            self.screen.blit(warning_text, text_rect)
-        
-        # Draw game cleared message
-        if self.game_cleared:
-            victory_text = self.font.render("GAME CLEARED!", True, (50, 255, 50))
-            text_rect = victory_text.get_rect(center=(self.width // 2, self.height // 2 - 40))
-            self.screen.blit(victory_text, text_rect)
-            
-            score_text = self.font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-            score_rect = score_text.get_rect(center=(self.width // 2, self.height // 2))
-            self.screen.blit(score_text, score_rect)
-            
-            restart_text = self.font.render("Press R to return to menu", True, (255, 255, 255))
-            restart_rect = restart_text.get_rect(center=(self.width // 2, self.height // 2 + 40))
-            self.screen.blit(restart_text, restart_rect)
-        
-        # Draw game over message
-        elif self.game_over:
-            game_over_text = self.font.render("GAME OVER", True, (255, 0, 0))
-            text_rect = game_over_text.get_rect(center=(self.width // 2, self.height // 2 - 20))
-            self.screen.blit(game_over_text, text_rect)
-            
-            restart_text = self.font.render("Press R to restart", True, (255, 255, 255))
-            restart_rect = restart_text.get_rect(center=(self.width // 2, self.height // 2 + 20))
-            self.screen.blit(restart_text, restart_rect)
-        
-        # Update display
-        pygame.display.flip()
+        # Update bombs
+        mark("effects")
+        self._update_bombs()
+    
+    def snapshot(self, detached=True):
+        """描画に必要な状態をまとめたスナップショットを作成
+
+        detached が True のときはエンティティをコピーし、以降の update の影響を受けない
+        読み取り専用の状態にする（描画スレッド用）。同じスレッドで直後に描画するだけなら
+        コピーは不要なので、False のときは現在のオブジェクトをそのまま参照する。
+        """
+        player = self.player
+        if detached:
+            one, many = freeze, freeze_all
+            hit_effects = tuple(dict(effect) for effect in self.hit_effects)
+            bombs = tuple(dict(bomb) for bomb in self.bombs)
+        else:
+            one, many = (lambda entity: entity), tuple
+            hit_effects, bombs = tuple(self.hit_effects), tuple(self.bombs)
+        return FrameSnapshot(
+            idle=self.is_idle(),
+            starfield=one(self.starfield),
+            terrain=one(self.terrain),
+            player=one(player),
+            boss=one(self.boss),
+            enemies=many(self.enemies),
+            powerups=many(self.powerups),
+            player_bullets=many(self.player_bullets),
+            enemy_bullets=many(self.enemy_bullets),
+            hit_effects=hit_effects,
+            bombs=bombs,
+            quality=self.quality.settings,
+            redraw=self.redraw_count,
+            hud=HudState(
+                score=self.score,
+                difficulty=self.difficulty,
+                graze_count=self.graze_count,
+                powerups=dict(player.powerups),
+                boss_warning=(self.boss_spawn_score - self.score <= 50 and self.boss is None
+                              and not self.boss_defeated),
+                game_cleared=self.game_cleared,
+                game_over=self.game_over,
+                paused=self.paused,
+                debug=self.quality.describe() if self.show_debug else None,
+                profile=self.profiler.overlay_lines() if self.profiler.show_overlay else None
+            )
+        )
+    
+    def render(self):
+        """現在の状態を描画して表示する（描画スレッドを使わない場合）"""
+        frame = self.renderer.draw(self.snapshot(detached=False))
+        if frame is not None:
+            self.present(frame)
+    
+    def present(self, frame):
+        """描き終えたフレームを画面に表示する（ウィンドウを作ったメインスレッドから呼ぶ）"""
+        display = self.display
+        start = time.perf_counter()
+        rects = frame.rects
+        if frame.surface is not display.surface:
+            # 描画スレッドの描画面から、変化した領域だけを写す
+            if rects is None:
+                display.surface.blit(frame.surface, (0, 0))
+            else:
+                for rect in rects:
+                    display.surface.blit(frame.surface, rect, rect)
+        if rects is None or not display.supports_partial_update:
+            display.present()
+        else:
+            display.present(rects)
+        self.render_ms = frame.render_ms
+        if frame.stages is not None:
+            frame.stages["flip"] = (time.perf_counter() - start) * 1000
+            self.profiler.end_render(frame.stages)
     
     def check_collision(self, obj1, obj2):
         # パワーアップアイテムとプレイヤーの場合は、自機全体での当たり判定を使用
@@ -416,30 +587,152 @@ class Game:
                     obj1.y < obj2.y + obj2.height and
                     obj1.y + obj1.height > obj2.y)
     
-    def _draw_powerup_status(self):
-        # Draw powerup status at the bottom of the screen
-        status_y = self.height - 30
-        font = pygame.font.SysFont(None, 24)
-        
-        # Multi-shot status
-        if self.player.powerups["multi_shot"] > 0:
-            text = font.render(f"Multi-Shot: {self.player.powerups['multi_shot'] // 60}s", True, (255, 255, 0))
-            self.screen.blit(text, (10, status_y))
-        
-        # Diagonal-shot status
-        if self.player.powerups["diagonal_shot"] > 0:
-            text = font.render(f"Diag-Shot: {self.player.powerups['diagonal_shot'] // 60}s", True, (0, 255, 255))
-            self.screen.blit(text, (150, status_y))
-        
-        # Speed-up status
-        if self.player.powerups["speed_up"] > 0:
-            text = font.render(f"Speed-Up: {self.player.powerups['speed_up'] // 60}s", True, (0, 255, 0))
-            self.screen.blit(text, (290, status_y))
-        
-        # Shield status
-        if self.player.powerups["shield"] > 0:
-            text = font.render(f"Shield: {self.player.powerups['shield'] // 60}s", True, (100, 100, 255))
-            self.screen.blit(text, (430, status_y))
+    def _spawn_x(self):
+        """出現位置（休止ゾーンの奥。地形が spawn_lead だけスクロールすると起きて動き出す）"""
+        return self.activation.wake_x + self.spawn_lead
+    
+    def _stage(self, kind, entity):
+        """エンティティを登録（ビューポートから離れていれば休止させる）
+
+        休止中のエンティティは地形のスクロール量で起こすので、地形が止まっている間や
+        ボス戦中（出現時に休止ゾーンを空にする）は休止させずにすぐ動かす。
+        """
+        if (self.boss is None and self.terrain.scroll_speed > 0
+                and self.activation.is_outside(entity)):
+            self.activation.add(kind, entity, self.terrain.scroll_x)
+        else:
+            self._activate(kind, entity)
+    
+    def _activate(self, kind, entity):
+        """エンティティを毎フレーム更新する対象に加える"""
+        if kind == "enemy":
+            self.enemies.append(entity)
+        elif kind == "powerup":
+            self.powerups.append(entity)
+        elif kind == "formation":
+            self.formations.append(entity)
+    
+    def _defeat_boss(self):
+        """ボス撃破時の処理"""
+        self.boss = None
+        self.boss_defeated = True
+        self.game_cleared = True  # ゲームクリア状態に設定
+        self.score += 100  # Extra points for defeating boss
+        self._queue_sound('boss_defeat')
+        if self.sound_manager:
+            try:
+                self.sound_manager.play_music('bgm')  # Return to normal music
+            except Exception:
+                pass
+    
+    def _detonate_bomb(self, x, y):
+        """ボムを起爆（数フレームかけて爆風が広がる）"""
+        self.bombs.append({
+            'x': x,
+            'y': y,
+            'radius': 0,
+            'max_radius': math.hypot(self.width, self.height),  # 画面全体を覆う
+            'duration': 30,  # 30フレーム（0.5秒）
+            'timer': 0,
+            'boss_hit': False  # ボスへのダメージは1回のみ
+        })
+        self._queue_sound('explosion', x)
+    
+    def _update_bombs(self):
+        """爆風の範囲内にある敵弾と敵を配列でまとめて判定し、一括で削除"""
+        for bomb in self.bombs[:]:
+            bomb['timer'] += 1
+            bomb['radius'] = bomb['max_radius'] * (bomb['timer'] / bomb['duration'])
+            
+            # 敵弾を一括で消去
+            if self.enemy_bullets:
+                xs, ys = centers(self.enemy_bullets)
+                hit = within_radius(xs, ys, bomb['x'], bomb['y'], bomb['radius'])
+                if hit.any():
+                    _, self.enemy_bullets = split_by_mask(self.enemy_bullets, hit)
+            
+            # 敵を一括で撃破
+            if self.enemies:
+                xs, ys = centers(self.enemies)
+                hit = within_radius(xs, ys, bomb['x'], bomb['y'], bomb['radius'])
+                if hit.any():
+                    destroyed, self.enemies = split_by_mask(self.enemies, hit)
+                    self.score += 10 * len(destroyed)
+                    for enemy in destroyed:
+                        if enemy.formation is not None:
+                            enemy.formation.release(enemy)
+            
+            # ボスには1回だけダメージを与える
+            if self.boss is not None and not bomb['boss_hit']:
+                boss_x = self.boss.x + self.boss.width / 2
+                boss_y = self.boss.y + self.boss.height / 2
+                if math.hypot(boss_x - bomb['x'], boss_y - bomb['y']) <= bomb['radius']:
+                    bomb['boss_hit'] = True
+                    if self.boss.take_damage(30 * self.player_damage_multiplier):
+                        self._defeat_boss()
+            
+            if bomb['timer'] >= bomb['duration']:
+                self.bombs.remove(bomb)
+    
+    def _remove_terrain_hits(self, bullets):
+        """地形に当たった弾をまとめて判定し、残った弾のリストを返す"""
+        if not bullets:
+            return bullets
+        xs, ys = centers(bullets)
+        hit = self.terrain.collide_points(xs, ys)
+        if not hit.any():
+            return bullets
+        _, remaining = split_by_mask(bullets, hit)
+        return remaining
+    
+    def _check_grazes(self):
+        """敵弾と自機の距離を配列でまとめて計算し、当たらずにかすめた弾を加点
+
+        自機の周りの輪に入った弾は保留にし、当たり判定に重ならずに輪から出たときに
+        加点する（画面外に出た場合は update のループで加点する）。
+        """
+        bullets = self.enemy_bullets
+        if self.game_over or not bullets:
+            return
+        
+        center_x, center_y = self.player.get_hitbox_center()
+        radius = self.player.hitbox_radius
+        xs, ys = centers(bullets)
+        near = within_radius(xs, ys, center_x, center_y, radius + self.graze_distance)
+        pending = flag_mask(bullets, 'graze_pending')
+        if not near.any() and not pending.any():
+            return
+        
+        # 当たり判定（check_collision と同じ矩形の重なり）に入った弾はグレイズにしない
+        # （シールド中で当たらなかった場合も含む）
+        inside = overlap_box(bullets, center_x - radius, center_y - radius,
+                             center_x + radius, center_y + radius)
+        done = flag_mask(bullets, 'grazed')
+        for bullet in compress(bullets, inside & ~done):
+            bullet.graze_pending = False
+            bullet.grazed = True
+        
+        # 輪に入った弾を保留にする
+        for bullet in compress(bullets, near & ~inside & ~done & ~pending):
+            bullet.graze_pending = True
+        
+        # 保留中に当たらず輪から出た弾を加点
+        left, _ = split_by_mask(bullets, pending & ~near & ~inside)
+        for bullet in left:
+            bullet.graze_pending = False
+            bullet.grazed = True
+        if left:
+            self._add_grazes(len(left))
+    
+    def _add_grazes(self, count):
+        self.graze_count += count
+        self.score += self.graze_points * count
+    
+    def _remove_enemy(self, enemy):
+        """敵をリストから外し、編隊に所属していれば編隊からも外す"""
+        self.enemies.remove(enemy)
+        if enemy.formation is not None:
+            enemy.formation.release(enemy)
     
     def _create_hit_effect(self, x, y):
         """ヒットエフェクト（爆発）を作成"""
@@ -462,21 +755,3 @@ class Game:
             # 時間切れのエフェクトを削除
             if effect['timer'] >= effect['duration']:
                 self.hit_effects.remove(effect)
-    
-    def _draw_hit_effects(self, screen):
-        """ヒットエフェクトを描画"""
-        for effect in self.hit_effects:
-            # 透明度を徐々に下げる
-            alpha = 255 * (1 - effect['timer'] / effect['duration'])
-            
-            # 色を設定（黄色から赤へのグラデーション）
-            r = min(255, 255)
-            g = min(255, 255 * (1 - effect['timer'] / effect['duration']))
-            b = 0
-            
-            # 円を描画
-            pygame.draw.circle(screen, (r, g, b), (int(effect['x']), int(effect['y'])), int(effect['radius']), 2)
-            
-            # 内側の円も描画
-            inner_radius = max(1, effect['radius'] * 0.6)
-            pygame.draw.circle(screen, (255, 255, 200), (int(effect['x']), int(effect['y'])), int(inner_radius), 1)
@@ -0,0 +1,53 @@
+import pygame
+import numpy as np
+
+# 品質設定ごとの1フレームあたりの最大グロー数
+GLOW_LIMITS = {
+    "off": 0,
+    "low": 48,
+    "medium": 128,
+    "high": 256
+}
+
+# 放射状グラデーションのキャッシュ
+_glow_sprites = {}  # (色, 半径) -> Surface
+
+def get_glow_sprite(color, radius):
+    """放射状グラデーションの画像を取得（色と半径ごとに1回だけ生成）"""
+    radius = max(2, int(radius) // 2 * 2)  # キャッシュの種類を抑えるため半径は2刻み
+    key = (color, radius)
+    sprite = _glow_sprites.get(key)
+    if sprite is None:
+        size = radius * 2
+        # 中心からの距離に応じて明るさを落とす（加算合成なので黒は透明と同じ）
+        coords = np.arange(size) - radius + 0.5
+        distance = np.sqrt(coords[:, None] ** 2 + coords[None, :] ** 2) / radius
+        intensity = np.clip(1 - distance, 0, 1) ** 2
+        pixels = (intensity[:, :, None] * np.array(color)[None, None, :]).astype(np.uint8)
+        sprite = pygame.surfarray.make_surface(pixels)
+        _glow_sprites[key] = sprite
+    return sprite
+
+class GlowLayer:
+    """フレーム中のグローを集め、BLEND_ADD で1回の blits にまとめて合成する"""
+    def __init__(self, quality="high"):
+        self.items = []
+        self.set_quality(quality)
+
+    def set_quality(self, quality):
+        self.quality = quality
+        self.max_sprites = GLOW_LIMITS[quality]
+
+    def add(self, color, radius, x, y):
+        """グローを追加（上限に達したら無視する）"""
+        if len(self.items) >= self.max_sprites:
+            return False
+        sprite = get_glow_sprite(color, radius)
+        half = sprite.get_width() // 2
+        self.items.append((sprite, (int(x) - half, int(y) - half), None, pygame.BLEND_ADD))
+        return True
+
+    def flush(self, screen):
+        if self.items:
+            screen.blits(self.items, doreturn=False)
+            self.items = []
@@ -1,144 +1,314 @@
 #!/usr/bin/env python3
 import pygame
 import sys
+import argparse
 from game import Game
+from display import Display, DisplayConfig, FramePacer
+from snapshot import RenderThread
+from profiler import FrameProfiler, ProfileCapture
+from memtrack import AllocationTracker, GcPolicy
+from sounds import pre_init_mixer
 
-def show_difficulty_menu_screen(screen, width, height):
-    """難易度選択メニューを表示"""
+# 静止画面の待機中にイベントを待つ最大時間（ミリ秒）
+IDLE_TIMEOUT_MS = 250
+
+# 合成済みのメニュー画面（ホバー状態ごとにキャッシュ）
+_menu_surfaces = {}
+
+def _menu_buttons(width, height):
+    """難易度選択ボタンの矩形"""
+    # Button dimensions
+    button_width = 200
+    button_height = 50
+    button_spacing = 20
+    
+    # Button positions
+    return {
+        "easy": pygame.Rect((width - button_width) // 2, height // 2 - button_height - button_spacing,
+                            button_width, button_height),
+        "normal": pygame.Rect((width - button_width) // 2, height // 2,
+                              button_width, button_height),
+        "hard": pygame.Rect((width - button_width) // 2, height // 2 + button_height + button_spacing,
+                            button_width, button_height)
+    }
+
+def _compose_difficulty_menu(width, height, hover):
+    """難易度選択メニューを1枚の画像に合成"""
     # Colors
     BLACK = (0, 0, 0)
     WHITE = (255, 255, 255)
-    GRAY = (150, 150, 150)
     HIGHLIGHT = (100, 200, 255)
     
     # Font
     font_large = pygame.font.SysFont(None, 60)
     font_medium = pygame.font.SysFont(None, 40)
     
-    # Button dimensions
-    button_width = 200
-    button_height = 50
-    button_spacing = 20
+    surface = pygame.Surface((width, height))
     
-    # Button positions
-    easy_button = pygame.Rect((width - button_width) // 2, height // 2 - button_height - button_spacing,
-                             button_width, button_height)
-    normal_button = pygame.Rect((width - button_width) // 2, height // 2,
-                               button_width, button_height)
-    hard_button = pygame.Rect((width - button_width) // 2, height // 2 + button_height + button_spacing,
-                             button_width, button_height)
+    # Draw background
+    surface.fill((0, 0, 50))  # Dark blue background
     
     # Title
     title_text = font_large.render("Horizontal Shooter", True, WHITE)
-    title_rect = title_text.get_rect(center=(width // 2, height // 4))
+    surface.blit(title_text, title_text.get_rect(center=(width // 2, height // 4)))
     
     # Subtitle
     subtitle_text = font_medium.render("Select Difficulty", True, WHITE)
-    subtitle_rect = subtitle_text.get_rect(center=(width // 2, height // 3))
-    
-    # Button texts
-    easy_text = font_medium.render("Easy", True, BLACK)
-    normal_text = font_medium.render("Normal", True, BLACK)
-    hard_text = font_medium.render("Hard", True, BLACK)
-    
-    # Mouse position for hover effect
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Check button hover
-    easy_hover = easy_button.collidepoint(mouse_pos)
-    normal_hover = normal_button.collidepoint(mouse_pos)
-    hard_hover = hard_button.collidepoint(mouse_pos)
-    
-    # Draw background
-    screen.fill((0, 0, 50))  # Dark blue background
-    
-    # Draw title and subtitle
-    screen.blit(title_text, title_rect)
-    screen.blit(subtitle_text, subtitle_rect)
+    surface.blit(subtitle_text, subtitle_text.get_rect(center=(width // 2, height // 3)))
     
     # Draw buttons with hover effect
-    pygame.draw.rect(screen, HIGHLIGHT if easy_hover else WHITE, easy_button, 0, 10)
-    pygame.draw.rect(screen, HIGHLIGHT if normal_hover else WHITE, normal_button, 0, 10)
-    pygame.draw.rect(screen, HIGHLIGHT if hard_hover else WHITE, hard_button, 0, 10)
+    labels = {"easy": "Easy", "normal": "Normal", "hard": "Hard"}
+    for name, button in _menu_buttons(width, height).items():
+        pygame.draw.rect(surface, HIGHLIGHT if hover == name else WHITE, button, 0, 10)
+        text = font_medium.render(labels[name], True, BLACK)
+        surface.blit(text, text.get_rect(center=button.center))
+    
+    return surface
+
+def show_difficulty_menu_screen(display, width, height, hover=None):
+    """難易度選択メニューを表示（合成済みの画像を1回 blit する）"""
+    key = (width, height, hover)
+    surface = _menu_surfaces.get(key)
+    if surface is None:
+        surface = _compose_difficulty_menu(width, height, hover)
+        _menu_surfaces[key] = surface
     
-    # Draw button text
-    screen.blit(easy_text, easy_text.get_rect(center=easy_button.center))
-    screen.blit(normal_text, normal_text.get_rect(center=normal_button.center))
-    screen.blit(hard_text, hard_text.get_rect(center=hard_button.center))
+    display.surface.blit(surface, (0, 0))
     
     # Update display
-    pygame.display.flip()
+    display.present()
 
 def check_button_click(mouse_pos, width, height):
     """難易度選択ボタンのクリックをチェック"""
-    # Button dimensions
-    button_width = 200
-    button_height = 50
-    button_spacing = 20
-    
-    # Button positions
-    easy_button = pygame.Rect((width - button_width) // 2, height // 2 - button_height - button_spacing,
-                             button_width, button_height)
-    normal_button = pygame.Rect((width - button_width) // 2, height // 2,
-                               button_width, button_height)
-    hard_button = pygame.Rect((width - button_width) // 2, height // 2 + button_height + button_spacing,
-                             button_width, button_height)
-    
     # Check which button was clicked
-    if easy_button.collidepoint(mouse_pos):
-        return "easy"
-    elif normal_button.collidepoint(mouse_pos):
-        return "normal"
-    elif hard_button.collidepoint(mouse_pos):
-        return "hard"
+    for name, button in _menu_buttons(width, height).items():
+        if button.collidepoint(mouse_pos):
+            return name
     
     return None
 
+def parse_size(text):
+    """'800x600' の形式の文字列を (800, 600) に変換"""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+    return width, height
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Horizontal Shooter")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="変化した領域だけを再描画する（低スペック環境向け）")
+    parser.add_argument("--render-thread", action="store_true",
+                        help="描画を別スレッドで行い、シミュレーションと並行させる")
+    parser.add_argument("--profile-csv", metavar="PATH",
+                        help="区間ごとの処理時間とエンティティ数をフレームごとに記録し、終了時に CSV に書き出す")
+    parser.add_argument("--capture-frames", type=int, default=120, metavar="N",
+                        help="F9 で cProfile に記録するフレーム数")
+    parser.add_argument("--capture-dir", default="profiles", metavar="DIR",
+                        help="cProfile の記録（.pstats と状態の JSON）を書き出すディレクトリ")
+    parser.add_argument("--track-allocations", action="store_true",
+                        help="tracemalloc でフレームごとの割り当てをモジュール別に集計し、終了時に表示する（重い）")
+    parser.add_argument("--gc-policy", action="store_true",
+                        help="起動後に gc.freeze し、第0世代の GC を余裕のあるフレームの終わりに行い、"
+                             "ボス戦中は自動の GC を止める")
+    
+    # 表示設定（指定しなかった項目は設定ファイル、次に既定値が使われる）
+    display_group = parser.add_argument_group("display")
+    display_group.add_argument("--config", metavar="PATH",
+                               help="表示設定の JSON ファイル（コマンドラインの指定が優先）")
+    display_group.add_argument("--logical", type=parse_size, metavar="WxH",
+                               help="ゲームの論理解像度 (default: 800x600)")
+    display_group.add_argument("--window", type=parse_size, metavar="WxH",
+                               help="ウィンドウの大きさ（software 拡大時のみ有効）")
+    display_group.add_argument("--fullscreen", action=argparse.BooleanOptionalAction,
+                               help="フルスクリーンで表示する")
+    display_group.add_argument("--scale", choices=["scaled", "software"],
+                               help="拡大方法: scaled (pygame.SCALED) または software (transform.scale)")
+    display_group.add_argument("--vsync", action=argparse.BooleanOptionalAction,
+                               help="垂直同期を有効にする（scaled のみ）")
+    display_group.add_argument("--doublebuf", action=argparse.BooleanOptionalAction,
+                               help="DOUBLEBUF フラグを付ける")
+    display_group.add_argument("--pacing", choices=["sleep", "busy"],
+                               help="フレーム待機方法: sleep (Clock.tick) または busy (Clock.tick_busy_loop)")
+    display_group.add_argument("--fps", type=int, help="目標フレームレート (default: 60)")
+    display_group.add_argument("--glow", choices=["off", "low", "medium", "high"], default="high",
+                               help="グローの品質（1フレームに描くグローの上限）")
+    display_group.add_argument("--frame-stats", action=argparse.BooleanOptionalAction,
+                               help="終了時にフレーム時間の統計を表示する")
+    return parser.parse_args(argv)
+
+def load_display_config(args):
+    """設定ファイルとコマンドライン引数から表示設定を作成"""
+    return DisplayConfig.load(
+        args.config,
+        logical_size=args.logical,
+        window_size=args.window,
+        fullscreen=args.fullscreen,
+        scale_mode=args.scale,
+        vsync=args.vsync,
+        doublebuf=args.doublebuf,
+        pacing=args.pacing,
+        fps=args.fps,
+        frame_stats=args.frame_stats
+    )
+
+def _finish_capture(capture):
+    """記録中の cProfile をそこまでのフレームで書き出す"""
+    path = capture.finish()
+    if path is not None:
+        print(f"profile: wrote {path}")
+
 def main():
-    # Initialize pygame
+    args = parse_args()
+    config = load_display_config(args)
+    
+    # Initialize pygame (ミキサーは合成する波形と同じレート・小さなバッファで初期化)
+    pre_init_mixer()
     pygame.init()
     
-    # Screen dimensions
-    width, height = 800, 600
-    screen = pygame.display.set_mode((width, height))
+    # Screen dimensions (論理解像度。ウィンドウの大きさとは独立)
+    width, height = config.logical_size
+    display = Display(config)  # 表示モードの設定はここで1回だけ行う
+    pygame.display.set_caption("Horizontal Shooter")
     
     # Game state
     current_state = "menu"  # "menu" or "game"
     game = None
     
+    # 静止画面の再描画管理
+    menu_hover = None
+    menu_needs_redraw = True
+    focused = True
+    
+    # 区間ごとの処理時間（ゲームをやり直しても同じものを使い続ける）
+    profiler = FrameProfiler()
+    if args.profile_csv:
+        profiler.start_recording()
+    
+    # F9 で次の N フレームを cProfile で記録する
+    capture = ProfileCapture(args.capture_frames, args.capture_dir)
+    
+    # フレームごとの割り当ての集計と GC のタイミングの制御
+    allocations = AllocationTracker() if args.track_allocations else None
+    gc_policy = GcPolicy(budget_ms=1000 / config.fps) if args.gc_policy else None
+    if gc_policy is not None:
+        gc_policy.start()
+    
+    # 描画スレッド（シミュレーションが公開したスナップショットを描画し、表示はメインスレッドで行う）
+    renderer = (RenderThread(lambda snapshot: game.renderer.draw(snapshot), lambda frame: game.present(frame))
+                if args.render_thread else None)
+    if renderer is not None:
+        renderer.start()
+    
     # Game loop
-    clock = pygame.time.Clock()
+    pacer = FramePacer(config.fps, config.pacing)
     while True:
+        # 何も動いていない間はイベントが来るまで待機する
+        idle = current_state == "menu" or game.is_idle()
+        if idle:
+            if renderer is not None:
+                # ゲームの作り直しやメニューの描画の前に、描画中のフレームを表示し終えておく
+                renderer.wait()
+            events = [pygame.event.wait(IDLE_TIMEOUT_MS)] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+        
         # Handle events
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
+                _finish_capture(capture)
+                if renderer is not None:
+                    renderer.stop()
+                if game is not None:
+                    game.close()
+                if allocations is not None:
+                    print(allocations.report())
+                if gc_policy is not None:
+                    gc_policy.stop()
+                    print(gc_policy.summary())
+                if args.profile_csv:
+                    frames = profiler.export_csv(args.profile_csv)
+                    print(f"profile: wrote {frames} frames to {args.profile_csv}")
+                if config.frame_stats:
+                    print(pacer.summary(config.describe()))
+                    if renderer is not None:
+                        print(f"render thread: rendered={renderer.frames_rendered} "
+                              f"dropped={renderer.frames_dropped}")
                 pygame.quit()
                 sys.exit()
             
+            # ウィンドウのフォーカスと再表示
+            if event.type == pygame.WINDOWFOCUSLOST:
+                focused = False
+                if game is not None:
+                    game.set_paused(True)
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+                focused = True
+                if game is not None:
+                    game.set_paused(False)
+            elif event.type == pygame.WINDOWEXPOSED:
+                menu_needs_redraw = True
+                if game is not None:
+                    game.invalidate()
+            
             if current_state == "menu":
                 # Menu event handling
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
+                    mouse_pos = display.to_logical(pygame.mouse.get_pos())
                     difficulty = check_button_click(mouse_pos, width, height)
                     if difficulty:
                         # Start game with selected difficulty
-                        game = Game(width, height, difficulty)
+                        game = Game(width, height, difficulty, dirty_rendering=args.dirty_rects,
+                                    display=display, glow_quality=args.glow, profiler=profiler,
+                                    fps=config.fps, render_thread=args.render_thread)
+                        game.set_paused(not focused)
                         current_state = "game"
+                        if allocations is not None and not allocations.tracing:
+                            allocations.start()
             else:
                 # Game event handling
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                    if capture.start(game.describe_state(), render_thread=renderer is not None):
+                        print(f"profile: capturing {capture.frames} frames")
                 result = game.handle_event(event)
                 if result == "menu":
+                    _finish_capture(capture)
+                    if gc_policy is not None:
+                        gc_policy.resume()
+                    game.close()
                     current_state = "menu"  # Return to menu
+                    menu_needs_redraw = True
         
         # Update and render
         if current_state == "menu":
-            show_difficulty_menu_screen(screen, width, height)
+            # ホバー状態が変わったときだけ再描画
+            hover = check_button_click(display.to_logical(pygame.mouse.get_pos()), width, height)
+            if hover != menu_hover or menu_needs_redraw:
+                show_difficulty_menu_screen(display, width, height, hover)
+                menu_hover = hover
+                menu_needs_redraw = False
         else:
+            capture.begin_frame()
             game.update()
-            game.render()
+            if renderer is not None:
+                renderer.publish(game.snapshot())
+                renderer.present_ready()
+            else:
+                game.render()
+            path = capture.end_frame(game.describe_state()) if capture.active else None
+            if path is not None:
+                print(f"profile: wrote {path}")
+            if allocations is not None:
+                allocations.end_frame()
+            if gc_policy is not None:
+                gc_policy.end_frame(game)
         
         # Cap the frame rate
-        clock.tick(60)
+        if idle:
+            pacer.reset()  # 待機時間は統計に含めない
+        else:
+            pacer.tick()
 
 if __name__ == "__main__":
     main()
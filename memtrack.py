@@ -0,0 +1,145 @@
+import gc
+import os
+import time
+import tracemalloc
+
+class AllocationTracker:
+    """tracemalloc で1フレームごとの割り当てをモジュール別に集計する
+
+    フレームの終わりにスナップショットを取ってから記録を消去するので、スナップショットには
+    そのフレームで割り当てられ、フレームの終わりまで残っているものだけが入る（弾のデータの
+    辞書や煙のパーティクルなど）。これを割り当てたファイル（モジュール）ごとに足し込む。
+    フレーム内で確保して解放したものはスナップショットに残らないため、フレーム中の
+    割り当ての最大値（tracemalloc のピーク）も記録する。
+    pygame の Surface の画素など SDL が確保するメモリは対象外。
+    """
+    def __init__(self):
+        self.modules = {}  # モジュール名 -> [バイト数, ブロック数]
+        self.peaks = []  # フレームごとの割り当ての最大値（バイト）
+        self.frames = 0
+        self.tracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.clear_traces()
+        self.tracing = True
+
+    def stop(self):
+        self.tracing = False
+        tracemalloc.stop()
+
+    def end_frame(self):
+        if not self.tracing:
+            return
+        self.peaks.append(tracemalloc.get_traced_memory()[1])
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib*"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+        for stat in snapshot.statistics("filename"):
+            name = os.path.splitext(os.path.basename(stat.traceback[0].filename))[0]
+            totals = self.modules.setdefault(name, [0, 0])
+            totals[0] += stat.size
+            totals[1] += stat.count
+        self.frames += 1
+        tracemalloc.clear_traces()  # 次のフレームの割り当てだけを記録する（ピークも戻る）
+
+    def report(self, top=15):
+        """1フレームあたりの割り当てが多いモジュールの一覧"""
+        if not self.frames:
+            return "allocations: no frames tracked"
+        frames = self.frames
+        lines = [f"allocations per frame ({frames} frames, peak mean={sum(self.peaks) / frames / 1024:.1f}KiB "
+                 f"max={max(self.peaks) / 1024:.1f}KiB)",
+                 f"{'module':<24}{'bytes':>12}{'blocks':>10}"]
+        ranked = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (size, count) in ranked[:top]:
+            lines.append(f"{name:<24}{size / frames:>12.0f}{count / frames:>10.1f}")
+        return "\n".join(lines)
+
+class GcPolicy:
+    """ゲーム中に循環参照の GC が動くタイミングを制御する
+
+    - 起動時と効果音の生成が終わったときに gc.freeze() で既存のオブジェクトを
+      GC の対象から外す（以降の GC で毎回たどらずに済む）
+    - 処理時間に余裕のあったフレームの終わりに第0世代だけを回収する
+    - ボス戦の間は自動の GC を止め、回収は余裕のあるフレームの終わりだけで行う
+    自動で動いた GC（フレームの途中に割り込んだもの）の回数と時間も記録する。
+    """
+    def __init__(self, budget_ms=1000 / 60, slack_ms=4.0, min_count=100):
+        self.budget_ms = budget_ms
+        self.slack_ms = slack_ms  # 残り時間がこれ以上あれば回収する
+        self.min_count = min_count  # 第0世代のオブジェクトがこれ未満なら回収しない
+        self.frozen_manager = None  # 効果音の生成後に freeze した SoundManager
+        self.scheduled = False  # 自分で gc.collect を呼んでいる間は True
+        self.collections = 0
+        self.collect_ms = 0.0
+        self.max_collect_ms = 0.0
+        self.automatic = 0  # 自動で動いた GC の回数
+        self.automatic_ms = 0.0
+        self.automatic_start = 0.0
+
+    def start(self):
+        """起動時に作ったオブジェクトを固定し、自動の GC を監視する"""
+        gc.callbacks.append(self._on_gc)
+        self.freeze()
+
+    def resume(self):
+        """自動の GC を元に戻す（ボス戦の途中でメニューに戻ったときなど）"""
+        gc.enable()
+
+    def stop(self):
+        gc.enable()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def freeze(self):
+        # この回収は自分で呼んだものなので自動の GC として数えない
+        self.scheduled = True
+        gc.collect()
+        self.scheduled = False
+        gc.freeze()
+
+    def end_frame(self, game):
+        """フレームの終わりに呼ぶ（game の処理時間・ボス・効果音の生成状況を見る）"""
+        manager = game.sound_manager
+        if manager is not None and manager is not self.frozen_manager and manager.is_loaded():
+            # 生成した効果音の波形などは以降ずっと残るので固定する
+            self.frozen_manager = manager
+            self.freeze()
+            return
+
+        boss_fight = game.boss is not None and not game.is_idle()
+        if boss_fight and gc.isenabled():
+            gc.disable()
+        elif not boss_fight and not gc.isenabled():
+            gc.enable()
+
+        frame_ms = game.update_ms + game.render_ms
+        if self.budget_ms - frame_ms >= self.slack_ms and gc.get_count()[0] >= self.min_count:
+            self.scheduled = True
+            start = time.perf_counter()
+            gc.collect(0)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.scheduled = False
+            self.collections += 1
+            self.collect_ms += elapsed
+            self.max_collect_ms = max(self.max_collect_ms, elapsed)
+
+    def _on_gc(self, phase, info):
+        if self.scheduled:
+            return
+        if phase == "start":
+            self.automatic_start = time.perf_counter()
+        else:
+            self.automatic += 1
+            self.automatic_ms += (time.perf_counter() - self.automatic_start) * 1000
+
+    def summary(self):
+        mean = self.collect_ms / self.collections if self.collections else 0.0
+        return (f"gc: scheduled={self.collections} mean={mean:.3f}ms max={self.max_collect_ms:.3f}ms "
+                f"automatic={self.automatic} ({self.automatic_ms:.1f}ms total) "
+                f"frozen={gc.get_freeze_count()}")
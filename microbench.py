@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""モジュールごとの重い関数のマイクロベンチマーク
+
+    python microbench.py [--filter 'bullet.*'] [--repeat 20] [--warmup 3]
+                         [--save baseline.json] [--baseline baseline.json]
+
+各ベンチマークはウォームアップの後、number 回の呼び出しを repeat 回計測し、
+1回あたりの時間（マイクロ秒）の最小・中央値・平均・標準偏差を表示する。
+--save で結果をベースラインとして保存し、--baseline で保存済みの結果との
+中央値の差を表示する。名前は「モジュール.関数[条件]」なので、1つのモジュールへの
+変更がそのモジュールのベンチマークの差として現れる。
+"""
+import argparse
+import fnmatch
+import json
+import random
+import statistics
+import sys
+import time
+import numpy as np
+from benchmark import WIDTH, HEIGHT, git_revision  # SDL のダミードライバの設定も行われる
+import pygame
+from bullet import Bullet
+from enemy import Enemy
+from boss import Boss
+from player import Player
+from powerup import PowerUp
+from game import Game
+from display import Display, DisplayConfig
+from sounds import SoundManager, pre_init_mixer
+
+class Benchmark:
+    """setup(context) が返す引数なしの関数を number 回呼ぶ時間を計測する"""
+    def __init__(self, name, setup, number=1000, repeat=None):
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.repeat = repeat  # None ならコマンドラインの --repeat を使う
+
+    def run(self, context, warmup, repeat):
+        random.seed(1)
+        np.random.seed(1)
+        func = self.setup(context)
+        number = self.number
+        for _ in range(warmup):
+            for _ in range(number):
+                func()
+        times = []
+        for _ in range(self.repeat or repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start) / number * 1e6)
+        return {
+            "number": number,
+            "min_us": min(times),
+            "median_us": statistics.median(times),
+            "mean_us": statistics.fmean(times),
+            "stdev_us": statistics.stdev(times) if len(times) > 1 else 0.0
+        }
+
+class Context:
+    """ベンチマークで共有する描画面と Game（SoundManager のスレッドは最後に止める）"""
+    def __init__(self):
+        self.display = Display(DisplayConfig(logical_size=(WIDTH, HEIGHT)))
+        self.screen = self.display.surface
+        self._game = None
+
+    @property
+    def game(self):
+        if self._game is None:
+            self._game = Game(WIDTH, HEIGHT, display=self.display)
+        return self._game
+
+    def close(self):
+        if self._game is not None:
+            self._game.close()
+
+# --- bullet ---
+
+def _smoky_bullet():
+    """煙のパーティクルが定常状態になった弾（画面中央付近）"""
+    bullet = Bullet(WIDTH // 2, HEIGHT // 2, 10, 0)
+    for _ in range(20):
+        bullet.update()
+    bullet.x = WIDTH // 2
+    return bullet
+
+def _bullet_update(context):
+    Bullet.smoke_interval = 2
+    return _smoky_bullet().update
+
+def _bullet_draw(context):
+    Bullet.smoke_interval = 2
+    bullet = _smoky_bullet()
+    return lambda: bullet.draw(context.screen)
+
+# --- enemy ---
+
+def _enemy_update(pattern):
+    def setup(context):
+        enemy = Enemy(WIDTH, HEIGHT // 2)
+        enemy.move_pattern = pattern
+        return enemy.update
+    return setup
+
+# --- boss ---
+
+def _boss_shoot(phase, pattern):
+    def setup(context):
+        boss = Boss(WIDTH, HEIGHT)
+        boss.phase = phase
+        boss.current_phase_index = phase - 1
+        boss.current_pattern = pattern
+
+        def shoot():
+            # 毎回発射するフレームにする（burst と laser は弾を出す区間に合わせる）
+            boss.shoot_timer = 10 ** 6
+            boss.burst_timer = 0
+            boss.laser_charging = 90
+            boss.laser_firing = 3
+            return boss.shoot()
+        return shoot
+    return setup
+
+# --- game ---
+
+def _check_collision(branch):
+    def setup(context):
+        game = context.game
+        player = Player(100, HEIGHT // 2)
+        if branch == "powerup_player":
+            a, b = PowerUp(105, HEIGHT // 2), player
+        elif branch == "enemy_player":
+            a, b = Enemy(100, HEIGHT // 2), player
+        else:
+            a, b = Bullet(300, HEIGHT // 2, 10, 0), Enemy(300, HEIGHT // 2)
+        return lambda: game.check_collision(a, b)
+    return setup
+
+# --- powerup ---
+
+def _powerup_draw(kind):
+    def setup(context):
+        powerup = PowerUp(WIDTH // 2, HEIGHT // 2)
+        powerup.type = kind
+        powerup.color = powerup.colors[kind]
+        return lambda: powerup.draw(context.screen)
+    return setup
+
+# --- player ---
+
+def _fire_bullets(powerup):
+    def setup(context):
+        player = Player(50, HEIGHT // 2)
+        if powerup is not None:
+            player.powerups[powerup] = 600
+        return player.fire_bullets
+    return setup
+
+# --- sounds ---
+
+def _sound_manager(context):
+    def construct():
+        # 効果音の生成はスレッドで行うので、生成が終わるまでを計測する
+        manager = SoundManager(pan_width=WIDTH)
+        manager.wait_until_loaded()
+        manager.close()
+    return construct
+
+def build_benchmarks():
+    benchmarks = [
+        Benchmark("bullet.Bullet.update[smoke]", _bullet_update, number=20000),
+        Benchmark("bullet.Bullet.draw[smoke]", _bullet_draw, number=5000)
+    ]
+    for pattern in ("straight", "sine", "zigzag"):
+        benchmarks.append(Benchmark(f"enemy.Enemy.update[{pattern}]", _enemy_update(pattern), number=20000))
+    for phase, patterns in sorted(Boss(WIDTH, HEIGHT).phase_patterns.items()):
+        for pattern in patterns:
+            benchmarks.append(Benchmark(f"boss.Boss.shoot[p{phase}_{pattern}]",
+                                        _boss_shoot(phase, pattern), number=5000))
+    for branch in ("powerup_player", "enemy_player", "rect"):
+        benchmarks.append(Benchmark(f"game.Game.check_collision[{branch}]",
+                                    _check_collision(branch), number=20000))
+    for kind in PowerUp(0, 0).types:
+        benchmarks.append(Benchmark(f"powerup.PowerUp.draw[{kind}]", _powerup_draw(kind), number=2000))
+    for powerup in (None, "multi_shot", "diagonal_shot"):
+        benchmarks.append(Benchmark(f"player.Player.fire_bullets[{powerup or 'normal'}]",
+                                    _fire_bullets(powerup), number=20000))
+    benchmarks.append(Benchmark("sounds.SoundManager[construct]", _sound_manager, number=1, repeat=5))
+    return benchmarks
+
+def format_row(name, stats, base=None, threshold=10.0):
+    row = (f"{name:<44}{stats['median_us']:>12.2f}{stats['min_us']:>12.2f}"
+           f"{stats['mean_us']:>12.2f}{stats['stdev_us']:>10.2f}")
+    if base is not None:
+        change = (stats["median_us"] - base["median_us"]) / base["median_us"] * 100
+        # 閾値を超えた差に印を付ける（+ は遅くなった）
+        mark = " !" if abs(change) > threshold else ""
+        row += f"{base['median_us']:>12.2f}{change:>+9.1f}%{mark}"
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module micro-benchmarks")
+    parser.add_argument("--filter", nargs="+", default=["*"],
+                        help="実行するベンチマーク名（fnmatch のパターン可）")
+    parser.add_argument("--warmup", type=int, default=3, help="計測前に捨てる回数")
+    parser.add_argument("--repeat", type=int, default=20, help="計測する回数")
+    parser.add_argument("--save", help="結果をベースラインとして保存する JSON")
+    parser.add_argument("--baseline", help="比較するベースラインの JSON")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="差に印を付ける割合（%%）")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            data = json.load(f)
+        baseline = data["results"]
+        print(f"baseline: {data.get('commit')}")
+
+    pre_init_mixer()
+    pygame.init()
+    context = Context()
+    benchmarks = [benchmark for benchmark in build_benchmarks()
+                  if any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in args.filter)]
+
+    header = f"{'benchmark (us/call)':<44}{'median':>12}{'min':>12}{'mean':>12}{'stdev':>10}"
+    if baseline:
+        header += f"{'base':>12}{'delta':>10}"
+    print(header)
+    results = {}
+    try:
+        for benchmark in benchmarks:
+            stats = benchmark.run(context, args.warmup, args.repeat)
+            results[benchmark.name] = stats
+            print(format_row(benchmark.name, stats, baseline.get(benchmark.name), args.threshold))
+            sys.stdout.flush()
+    finally:
+        context.close()
+
+    if args.save:
+        commit, dirty = git_revision()
+        with open(args.save, "w") as f:
+            json.dump({"commit": commit, "dirty": dirty, "warmup": args.warmup,
+                       "repeat": args.repeat, "results": results}, f, indent=2)
+            f.write("\n")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import pygame
+import threading
+from collections import deque
+import numpy as np
+from synth import to_stereo_pcm
+
+class MusicTrack:
+    """ループする曲。強さに応じて重ねるレイヤーと、仕上げの音量処理を持つ"""
+    def __init__(self, name, layers, loop_seconds=10.0, volume=0.5, shaper=None, gain=1.0):
+        self.name = name
+        self.layers = layers  # (鳴らし始める強さ, 音源) のリスト
+        self.loop_seconds = loop_seconds
+        self.volume = volume
+        self.shaper = shaper  # (波形, 強さ) -> 波形（歪みなど）
+        self.gain = gain
+
+    def render(self, start, duration, sample_rate, intensity):
+        """ループ内の start 秒から duration 秒分を合成して [-1, 1] の波形にする"""
+        samples = sum(source.render(duration, sample_rate, start=start)
+                      for level, source in self.layers if level <= intensity)
+        if self.shaper is not None:
+            samples = self.shaper(samples, intensity)
+        return np.clip(samples * self.gain, -1, 1)
+
+class MusicStreamer:
+    """曲を1秒ずつのチャンクに分けて合成し、Channel.queue で途切れずに流す
+
+    合成はワーカースレッドで行い、先読みするチャンクは1つだけなので
+    曲全体をメモリに持つ必要はない。強さ（レイヤーの重なり）を変えると、まだ
+    チャンネルに予約していない合成済みのチャンクを捨てて合成し直す。再生中のチャンクと
+    Channel.queue で予約済みのチャンクは取り消せないので、変化が聞こえるまでの遅れは
+    最大でチャンク2つ分。曲の切り替えは mixer.stop() を使わずに
+    同じチャンネルで次のチャンクに置き換える。
+    update() はメインループから毎フレーム呼ぶ。
+    """
+    def __init__(self, channel, sample_rate, chunk_seconds=1.0, ahead=1):
+        self.channel = channel
+        self.sample_rate = sample_rate
+        self.chunk_seconds = chunk_seconds
+        self.ahead = ahead  # 合成済みで待機させるチャンク数
+        self.ready = deque()  # (世代, ループ内の開始位置, Sound)
+        self.track = None
+        self.intensity = 0
+        self.generation = 0  # 曲を切り替えるたびに増やし、古いチャンクを捨てる
+        self.position = 0.0  # 次に合成するループ内の位置（秒）
+        self.restart = False  # 次のチャンクは再生中のチャンクを置き換えて鳴らす
+        self.condition = threading.Condition()
+        self.running = True
+        self.worker = threading.Thread(target=self._run, name="music-stream", daemon=True)
+        self.worker.start()
+
+    def play(self, track):
+        """曲を切り替える（None で停止）"""
+        with self.condition:
+            self.track = track
+            self.generation += 1
+            self.position = 0.0
+            self.ready.clear()
+            self.restart = True
+            self.condition.notify_all()
+        if track is None:
+            self.channel.stop()
+
+    def set_intensity(self, intensity):
+        """強さを変え、予約前の合成済みチャンクを新しい強さで合成し直す"""
+        if intensity == self.intensity:
+            return
+        with self.condition:
+            self.intensity = intensity
+            if self.ready:
+                self.position = self.ready[0][1]
+                self.ready.clear()
+            self.condition.notify_all()
+
+    def update(self):
+        """再生中のチャンクの次を予約する（チャンクの予約は常に1つだけ）"""
+        with self.condition:
+            if not self.ready or self.ready[0][0] != self.generation:
+                return
+            if self.restart or not self.channel.get_busy():
+                _, _, sound = self.ready.popleft()
+                self.channel.play(sound)
+                self.restart = False
+            elif self.channel.get_queue() is None:
+                _, _, sound = self.ready.popleft()
+                self.channel.queue(sound)
+            else:
+                return
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.worker.join()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and (self.track is None or len(self.ready) >= self.ahead):
+                    self.condition.wait()
+                if not self.running:
+                    return
+                track = self.track
+                generation = self.generation
+                intensity = self.intensity
+                start = self.position
+                self.position = (start + self.chunk_seconds) % track.loop_seconds
+
+            try:
+                samples = track.render(start, self.chunk_seconds, self.sample_rate, intensity)
+                sound = pygame.sndarray.make_sound(to_stereo_pcm(samples))
+                sound.set_volume(track.volume)
+            except Exception as e:
+                print(f"Error streaming music: {e}")
+                with self.condition:
+                    self.track = None
+                continue
+
+            with self.condition:
+                if generation != self.generation:
+                    continue
+                if intensity != self.intensity:
+                    # 合成中に強さが変わったので、同じ位置から合成し直す
+                    self.position = start
+                    continue
+                self.ready.append((generation, start, sound))
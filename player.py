@@ -1,5 +1,6 @@
 import pygame
-import math
+import copy
+from assets import shield_frames, invincible_frames, tick_frame, blit_centered
 
 class Player:
     def __init__(self, x, y):
@@ -12,6 +13,7 @@ class Player:
         self.shield_active = False
         self.shield_timer = 0
         self.shield_duration = 300  # フレーム数（約5秒）
+        self.shield_ripples = 3  # シールドの波紋の数（品質設定で変わる）
         self.max_hp = 3  # HPを2から3に増加
         self.hp = self.max_hp
         self.hit_effect_timer = 0
@@ -27,13 +29,13 @@ class Player:
         self.invincible_timer = 0  # 無敵時間カウンター
         self.invincible_duration = 120  # 無敵時間（2秒 = 120フレーム）
 
-    def move(self, dx, dy):
+    def move(self, dx, dy, width, height):
         self.x += dx * self.speed
         self.y += dy * self.speed
         
-        # 画面外に出ないように制限
-        self.x = max(self.width // 2, min(self.x, 800 - self.width // 2))
-        self.y = max(self.height // 2, min(self.y, 600 - self.height // 2))
+        # 画面外に出ないように制限（width, height は論理解像度）
+        self.x = max(self.width // 2, min(self.x, width - self.width // 2))
+        self.y = max(self.height // 2, min(self.y, height - self.height // 2))
 
     def activate_shield(self):
         self.shield_active = True
@@ -69,7 +71,7 @@ class Player:
                     self.speed = 5  # 元のスピードに戻す
             
         # キー入力による移動処理（引数が提供されている場合）
-        if keys is not None:
+        if keys is not None and width is not None and height is not None:
             dx, dy = 0, 0
             if keys[pygame.K_LEFT] or keys[pygame.K_a]:
                 dx = -1
@@ -80,7 +82,7 @@ class Player:
             if keys[pygame.K_DOWN] or keys[pygame.K_s]:
                 dy = 1
             
-            self.move(dx, dy)
+            self.move(dx, dy, width, height)
 
     def draw(self, screen):
         # 自機の描画（より洗練されたデザイン）
@@ -127,22 +129,16 @@ class Player:
         pygame.draw.circle(screen, (255, 255, 255), 
                         (self.x + self.width // 6 + 2, self.y - 2), self.height // 10)
         
-        # シールドエフェクト
+        # シールドエフェクト（波紋を含めて事前に生成したフレームを描画）
         if self.shield_active:
-            shield_radius = self.width + 5 + math.sin(pygame.time.get_ticks() / 100) * 3
-            pygame.draw.circle(screen, (100, 100, 255, 128), (self.x, self.y), shield_radius, 2)
-            # エネルギー波紋
-            wave_offset = (pygame.time.get_ticks() % 30) / 30
-            for i in range(3):
-                wave_radius = shield_radius - 10 + i * 7 + wave_offset * 7
-                if wave_radius < shield_radius:
-                    pygame.draw.circle(screen, (150, 150, 255, 100), (self.x, self.y), wave_radius, 1)
+            frames = shield_frames(self.width + 5, self.shield_ripples)
+            blit_centered(screen, frames[tick_frame(pygame.time.get_ticks(), len(frames))], self.x, self.y)
         
         # 無敵状態のエフェクト
         elif self.invincible:
             # 無敵状態の視覚的効果（青い波紋）
-            inv_radius = self.width * 0.7 + math.sin(pygame.time.get_ticks() / 50) * 2
-            pygame.draw.circle(screen, (100, 200, 255, 100), (self.x, self.y), inv_radius, 1)
+            frames = invincible_frames(self.width * 0.7)
+            blit_centered(screen, frames[tick_frame(pygame.time.get_ticks(), len(frames))], self.x, self.y)
         
         # 当たり判定の赤い点
         pygame.draw.circle(screen, (255, 0, 0), (self.x, self.y), 3)
@@ -150,6 +146,18 @@ class Player:
         # HPバーの描画
         self.draw_hp_bar(screen)
 
+    def snapshot(self):
+        """描画用のコピー（update で書き換えるパワーアップの残り時間も複製）"""
+        frozen = copy.copy(self)
+        frozen.powerups = dict(self.powerups)
+        return frozen
+
+    def add_glow(self, glow):
+        # エンジン炎のグロー（点滅で非表示のフレームは除く）
+        if self.invincible and self.invincible_timer % 10 < 5:
+            return
+        glow.add((255, 120, 0), 14, self.x - self.width // 2 - 6, self.y)
+
     def draw_hp_bar(self, screen):
         # HPバーの背景
         bar_width = 40
@@ -178,6 +186,11 @@ class Player:
         # 枠線
         pygame.draw.rect(screen, (200, 200, 200), (bar_x, bar_y, bar_width, bar_height), 1)
 
+    def get_draw_rects(self):
+        # 船体・炎・HPバー・シールドを含む描画範囲
+        radius = self.width + 10
+        return [pygame.Rect(self.x - radius, self.y - radius, radius * 2, radius * 2)]
+
     def get_hitbox_center(self):
         # 当たり判定は中心点のみ
         return (self.x, self.y)
@@ -1,6 +1,7 @@
 import pygame
 import random
 import math
+from assets import render_text
 
 class PowerUp:
     def __init__(self, x, y):
@@ -11,7 +12,7 @@ class PowerUp:
         self.speed = 2
         
         # Randomly select powerup type
-        self.types = ["multi_shot", "diagonal_shot", "speed_up", "shield"]
+        self.types = ["multi_shot", "diagonal_shot", "speed_up", "shield", "bomb"]
         self.type = random.choice(self.types)
         
         # Set color based on type
@@ -19,7 +20,8 @@ class PowerUp:
             "multi_shot": (255, 255, 0),     # Yellow
             "diagonal_shot": (0, 255, 255),  # Cyan
             "speed_up": (0, 255, 0),         # Green
-            "shield": (100, 100, 255)        # Blue
+            "shield": (100, 100, 255),       # Blue
+            "bomb": (255, 100, 255)          # Magenta
         }
         self.color = self.colors[self.type]
         
@@ -142,18 +144,35 @@ class PowerUp:
                 y2 = center_y + math.sin(angle_i + math.pi) * line_length
                 pygame.draw.line(screen, self.color, (x1, y1), (x2, y2), 2)
         
+        elif self.type == "bomb":
+            # Draw bomb shape with a rotating fuse spark
+            radius = self.width // 2 + pulse
+            pygame.draw.circle(screen, self.color, (center_x, center_y), radius)
+            
+            angle = math.radians(self.rotation)
+            spark_x = center_x + math.cos(angle) * (radius + 3)
+            spark_y = center_y + math.sin(angle) * (radius + 3)
+            pygame.draw.circle(screen, (255, 255, 255), (spark_x, spark_y), 2)
+        
         # Draw letter inside
-        font = pygame.font.SysFont(None, 15)
         letters = {
             "multi_shot": "M",
             "diagonal_shot": "D",
             "speed_up": "S",
-            "shield": "P"  # P for Protection
+            "shield": "P",  # P for Protection
+            "bomb": "B"
         }
-        text = font.render(letters[self.type], True, (0, 0, 0))
+        text = render_text(15, letters[self.type], (0, 0, 0))
         text_rect = text.get_rect(center=(center_x, center_y))
         screen.blit(text, text_rect)
     
+    def get_draw_rects(self):
+        # 脈動と回転を含めた描画範囲
+        center_x = self.x + self.width // 2
+        center_y = self.y + self.height // 2
+        radius = self.width // 2 + 12
+        return [pygame.Rect(center_x - radius, center_y - radius, radius * 2, radius * 2)]
+    
     def apply_effect(self, player):
         """Apply powerup effect to player"""
         if self.type == "multi_shot":
@@ -173,4 +192,8 @@ class PowerUp:
             player.powerups["shield"] = 300  # 5 seconds
             return "Shield activated!"
             
+        elif self.type == "bomb":
+            # 爆発処理は Game 側で行う（敵弾と敵を一掃）
+            return "Bomb detonated!"
+            
         return "Power-Up collected!"
@@ -0,0 +1,203 @@
+import cProfile
+import csv
+import json
+import os
+import time
+from collections import deque
+
+# 計測する区間（Game.update と Game.render の処理の順番）
+UPDATE_STAGES = ("player", "effects", "spawning", "powerups", "boss", "enemies",
+                 "player_bullets", "enemy_bullets")
+RENDER_STAGES = ("clear", "entities", "bullets", "effects", "hud", "flip")
+COUNTS = ("enemies", "player_bullets", "enemy_bullets", "powerups", "hit_effects")
+
+class StageTimer:
+    """1つの処理の中の区間ごとの時間を計測する
+
+    mark(stage) で直前の区間を閉じて次の区間を始め、finish() で1フレーム分を確定する。
+    同じ区間に複数回入った場合は合計する。無効なときの mark は何もせずに戻る。
+    """
+    def __init__(self, stages):
+        self.stages = stages
+        self.enabled = False
+        self.times = dict.fromkeys(stages, 0.0)
+        self.last = None  # 直前に確定したフレームの {区間: ms}
+        self.stage = None
+        self.start = 0.0
+
+    def mark(self, stage):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.stage is not None:
+            self.times[self.stage] += (now - self.start) * 1000
+        self.stage = stage
+        self.start = now
+
+    def finish(self):
+        """計測中の区間を閉じ、このフレームの区間ごとの時間を返す"""
+        if not self.enabled:
+            return None
+        self.mark(None)
+        self.last, self.times = self.times, dict.fromkeys(self.stages, 0.0)
+        return self.last
+
+class FrameProfiler:
+    """update と render の区間ごとの時間とエンティティ数をフレームごとに記録する
+
+    オーバーレイには直近 window フレームの平均を表示し、記録は CSV に書き出せる。
+    render の区間は描画側（Renderer）の StageTimer で計測し、表示したときに
+    end_render で受け取る。記録の1行は表示したフレームとその直前の update の組。
+    """
+    def __init__(self, window=60, history=36000, refresh=15):
+        self.update = StageTimer(UPDATE_STAGES)
+        self.show_overlay = False
+        self.recording = False
+        self.counts = dict.fromkeys(COUNTS, 0)
+        self.rolling = {("update", stage): deque(maxlen=window) for stage in UPDATE_STAGES}
+        self.rolling.update({("render", stage): deque(maxlen=window) for stage in RENDER_STAGES})
+        self.records = deque(maxlen=history)
+        self.frame = 0
+        self.refresh = refresh  # オーバーレイの文字列を作り直す間隔（フレーム）
+        self.lines = ()
+
+    @property
+    def enabled(self):
+        return self.update.enabled
+
+    def _set_enabled(self):
+        enabled = self.show_overlay or self.recording
+        self.update.enabled = enabled
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self._set_enabled()
+
+    def start_recording(self):
+        self.recording = True
+        self._set_enabled()
+
+    def end_update(self, counts):
+        times = self.update.finish()
+        if times is None:
+            return
+        self.counts = counts
+        for stage, ms in times.items():
+            self.rolling["update", stage].append(ms)
+
+    def end_render(self, times):
+        """表示したフレームの render の区間ごとの時間を記録する"""
+        for stage, ms in times.items():
+            self.rolling["render", stage].append(ms)
+        if self.recording:
+            row = {"frame": self.frame}
+            row.update((f"update_{stage}", ms) for stage, ms in (self.update.last or {}).items())
+            row.update((f"render_{stage}", ms) for stage, ms in times.items())
+            row.update(self.counts)
+            self.records.append(row)
+        self.frame += 1
+
+    def average(self, kind, stage):
+        times = self.rolling[kind, stage]
+        return sum(times) / len(times) if times else 0.0
+
+    def overlay_lines(self):
+        """オーバーレイに表示する文字列（refresh フレームごとに作り直す）"""
+        if self.frame % self.refresh == 0 or not self.lines:
+            lines = []
+            for kind, stages in (("update", UPDATE_STAGES), ("render", RENDER_STAGES)):
+                total = sum(self.average(kind, stage) for stage in stages)
+                lines.append(f"{kind} {total:.2f}ms")
+                lines.extend(f"  {stage} {self.average(kind, stage):.2f}" for stage in stages)
+            counts = self.counts
+            lines.append(f"enemies {counts['enemies']} bullets {counts['player_bullets']}/"
+                         f"{counts['enemy_bullets']} powerups {counts['powerups']} "
+                         f"effects {counts['hit_effects']}")
+            self.lines = tuple(lines)
+        return self.lines
+
+    def export_csv(self, path):
+        """記録したフレームを CSV に書き出す"""
+        fields = (["frame"] + [f"update_{stage}" for stage in UPDATE_STAGES]
+                  + [f"render_{stage}" for stage in RENDER_STAGES] + list(COUNTS))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for row in self.records:
+                writer.writerow({key: round(value, 4) if isinstance(value, float) else value
+                                 for key, value in row.items()})
+        return len(self.records)
+
+class ProfileCapture:
+    """キーを押した後の frames フレームを cProfile で記録する
+
+    start(state) の後、メインループは毎フレーム update と描画を begin_frame() と
+    end_frame(state) で挟む。指定フレーム数に達すると .pstats と、開始時と各フレームの
+    ゲームの状態（ボスのフェーズとパターン、エンティティ数）の JSON を書き出す。
+    ファイル名は開始時刻と、ボス戦なら開始時のフェーズとパターン。
+    cProfile は呼び出したスレッドしか計測しないため、描画スレッドの処理は含まれない。
+    """
+    def __init__(self, frames=120, directory="profiles"):
+        self.frames = frames
+        self.directory = directory
+        self.profile = None
+        self.started = None
+        self.state = None  # 開始時の状態
+        self.info = {}
+        self.timeline = []  # フレームごとの状態
+
+    @property
+    def active(self):
+        return self.profile is not None
+
+    def start(self, state, **info):
+        """記録を始める（info はそのまま JSON に書き出す）"""
+        if self.active:
+            return False
+        self.profile = cProfile.Profile()
+        self.started = time.localtime()
+        self.state = state
+        self.info = info
+        self.timeline = []
+        return True
+
+    def begin_frame(self):
+        if self.profile is not None:
+            self.profile.enable()
+
+    def end_frame(self, state):
+        """1フレーム分の計測を止め、記録が終わったら書き出したファイル名を返す"""
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        self.timeline.append(state)
+        if len(self.timeline) >= self.frames:
+            return self.finish()
+        return None
+
+    def finish(self):
+        """途中でも記録を終えて書き出す（ゲームの終了時など）"""
+        if self.profile is None:
+            return None
+        profile, self.profile = self.profile, None
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime("profile_%Y%m%d_%H%M%S", self.started)
+        if self.state.get("boss_pattern") is not None:
+            name += f"_p{self.state['boss_phase']}_{self.state['boss_pattern']}"
+        base = os.path.join(self.directory, name)
+        profile.dump_stats(base + ".pstats")
+
+        patterns = {}
+        for state in self.timeline:
+            if state.get("boss_pattern") is not None:
+                key = f"p{state['boss_phase']}_{state['boss_pattern']}"
+                patterns[key] = patterns.get(key, 0) + 1
+        with open(base + ".json", "w") as f:
+            json.dump(dict(self.info, pstats=base + ".pstats",
+                           started=time.strftime("%Y-%m-%dT%H:%M:%S", self.started),
+                           frames=len(self.timeline),
+                           state=self.state,
+                           boss_patterns=patterns,  # ボスのフェーズとパターンごとのフレーム数
+                           timeline=self.timeline), f, indent=2)
+            f.write("\n")
+        return base + ".pstats"
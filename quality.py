@@ -0,0 +1,59 @@
+from collections import deque
+
+# 見た目の負荷を下げる段階（0 が最高品質）。ゲームの進行には影響しない項目だけを変える
+#   smoke_interval: 弾の煙を何フレームごとに出すか（0 なら出さない）
+#   hit_inner_ring: ヒットエフェクトの内側の輪を描くか
+#   shield_ripples: シールドの波紋の数
+#   glow: グローの品質の上限
+QUALITY_LEVELS = (
+    {"name": "full", "smoke_interval": 2, "hit_inner_ring": True, "shield_ripples": 3, "glow": "high"},
+    {"name": "smoke", "smoke_interval": 4, "hit_inner_ring": True, "shield_ripples": 3, "glow": "high"},
+    {"name": "rings", "smoke_interval": 4, "hit_inner_ring": False, "shield_ripples": 3, "glow": "high"},
+    {"name": "ripples", "smoke_interval": 4, "hit_inner_ring": False, "shield_ripples": 1, "glow": "high"},
+    {"name": "glow", "smoke_interval": 4, "hit_inner_ring": False, "shield_ripples": 1, "glow": "low"},
+    {"name": "minimal", "smoke_interval": 0, "hit_inner_ring": False, "shield_ripples": 0, "glow": "off"}
+)
+
+class QualityGovernor:
+    """直近のフレーム時間の平均を見て、見た目の品質を段階的に上げ下げする
+
+    平均が予算を超えたら1段階下げ、予算に十分な余裕があれば1段階戻す。
+    切り替えの直後は平均が入れ替わるまで次の切り替えを行わない。
+    """
+    def __init__(self, budget_ms=1000 / 60, window=60, headroom=0.7):
+        self.budget_ms = budget_ms
+        self.headroom = headroom  # 平均がこの割合を下回ったら品質を戻す
+        self.frame_times = deque(maxlen=window)
+        self.level = 0
+        self.cooldown = window
+
+    @property
+    def settings(self):
+        return QUALITY_LEVELS[self.level]
+
+    def average(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def record(self, frame_ms):
+        """1フレーム分の処理時間を記録し、品質を変えたら True を返す"""
+        self.frame_times.append(frame_ms)
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+
+        average = self.average()
+        if average > self.budget_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+        elif average < self.budget_ms * self.headroom and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+        self.cooldown = self.frame_times.maxlen
+        return True
+
+    def describe(self):
+        """デバッグ表示用の文字列"""
+        return (f"Quality: {self.level}/{len(QUALITY_LEVELS) - 1} ({self.settings['name']}) "
+                f"{self.average():.1f}ms")
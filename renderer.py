@@ -0,0 +1,275 @@
+import time
+from collections import namedtuple
+import pygame
+from bullet import draw_bullets
+from assets import hit_effect_frames, render_text, blit_centered
+from glow import GlowLayer, GLOW_LIMITS
+from dirty import DirtyRectTracker
+from profiler import StageTimer, RENDER_STAGES
+
+# 描き終えた1フレーム。画面への表示はウィンドウを作ったメインスレッドが行う
+RenderedFrame = namedtuple("RenderedFrame", [
+    "surface",    # 描いた描画面（Display の描画面と違えば表示の前に写す）
+    "rects",      # 更新する矩形のリスト（全画面更新なら None）
+    "render_ms",  # 描画にかかった時間（表示は含まない）
+    "stages"      # 区間ごとの時間（プロファイラが無効なら None。flip は表示側で埋める）
+])
+
+class Renderer:
+    """スナップショットを描画面に描く（表示はしない）
+
+    差分矩形・グロー・静止画面の画像・区間ごとの時間など、描画だけが使う状態を持つ。
+    描画スレッドを使う場合、このオブジェクトに触るのは描画スレッドだけで、
+    シミュレーションとのやり取りはスナップショットと RenderedFrame だけで行う。
+    """
+    def __init__(self, surface, dirty_rendering=False, glow_quality="high", bg_color=(0, 0, 50),
+                 profiler=None):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        self.bg_color = bg_color
+        self.font_size = 36
+        self.profiler = profiler
+        self.timer = StageTimer(RENDER_STAGES)
+
+        # 差分矩形描画（変化した領域だけを消去・更新する）
+        self.dirty_rendering = dirty_rendering
+        self.dirty_rects = DirtyRectTracker(self.width, self.height) if dirty_rendering else None
+
+        # Glow layer (描画範囲が広がるため差分矩形描画では使わない)
+        self.glow_quality = glow_quality
+        self.glow = GlowLayer("off" if dirty_rendering else glow_quality)
+        self.quality = None  # 反映済みの品質レベルの設定
+
+        # 静止画面（ゲームオーバー・クリア・一時停止）の合成済み画像と、そのときの HUD
+        self.static_frame = None
+        self.static_hud = None
+        self.static_frame_shown = False
+        self.redraw = 0  # 反映済みの描き直しの要求の回数
+
+    def _apply_quality(self, settings):
+        self.quality = settings
+        if not self.dirty_rendering:
+            # 指定されたグローの品質を上限にする
+            self.glow.set_quality(min(self.glow_quality, settings["glow"], key=GLOW_LIMITS.get))
+
+    def draw(self, snapshot):
+        """スナップショットを描画し、表示するフレームを返す（表示するものがなければ None）"""
+        start = time.perf_counter()
+        hud = snapshot.hud
+        screen = self.surface
+
+        # ウィンドウの再表示などで描き直しを求められたら画面全体を更新する
+        if snapshot.redraw != self.redraw:
+            self.redraw = snapshot.redraw
+            self.static_frame_shown = False
+            if self.dirty_rects is not None:
+                self.dirty_rects.force_full()
+        if snapshot.quality is not self.quality:
+            self._apply_quality(snapshot.quality)
+
+        # 静止画面は合成済みの画像を必要なときだけ表示する
+        if snapshot.idle and self.static_frame is not None and hud == self.static_hud:
+            if self.static_frame_shown:
+                return None
+            screen.blit(self.static_frame, (0, 0))
+            self.static_frame_shown = True
+            return RenderedFrame(screen, None, (time.perf_counter() - start) * 1000, None)
+
+        timer = self.timer
+        timer.enabled = self.profiler is not None and self.profiler.enabled
+        mark = timer.mark
+
+        # Clear screen
+        mark("clear")
+        if self.dirty_rects is not None:
+            self.dirty_rects.begin(self._collect_draw_rects(snapshot))
+            self.dirty_rects.clear(screen, self.bg_color)
+        elif snapshot.starfield is not None:
+            snapshot.starfield.draw(screen)
+        else:
+            screen.fill(self.bg_color)
+
+        # Draw terrain
+        mark("entities")
+        snapshot.terrain.draw(screen)
+
+        # Draw player
+        snapshot.player.draw(screen)
+
+        # Draw boss
+        if snapshot.boss is not None:
+            snapshot.boss.draw(screen)
+
+        # Draw enemies
+        for enemy in snapshot.enemies:
+            enemy.draw(screen)
+
+        # Draw powerups
+        for powerup in snapshot.powerups:
+            powerup.draw(screen)
+
+        # Draw bullets (1回の blits でまとめて描画)
+        mark("bullets")
+        draw_bullets(screen, [(snapshot.player_bullets, None),
+                              (snapshot.enemy_bullets, (255, 0, 0))])  # Red for enemy bullets
+
+        # Draw hit effects
+        mark("effects")
+        self._draw_hit_effects(screen, snapshot.hit_effects)
+
+        # Draw bomb blast rings
+        for bomb in snapshot.bombs:
+            pygame.draw.circle(screen, (255, 200, 255), (int(bomb['x']), int(bomb['y'])),
+                               int(bomb['radius']), 4)
+
+        # Draw glow (加算合成でまとめて描画)
+        self._draw_glow(snapshot)
+
+        # Draw score and difficulty
+        mark("hud")
+        score_text = render_text(self.font_size, f"Score: {hud.score}", (255, 255, 255))
+        self._draw_hud(score_text, (10, 10))
+
+        difficulty_text = render_text(self.font_size, f"Difficulty: {hud.difficulty.capitalize()}", (255, 255, 255))
+        self._draw_hud(difficulty_text, (10, 40))
+
+        graze_text = render_text(self.font_size, f"Graze: {hud.graze_count}", (200, 200, 255))
+        self._draw_hud(graze_text, (10, 70))
+
+        # Draw powerup status
+        self._draw_powerup_status(hud.powerups)
+
+        # Draw boss approaching message
+        if hud.boss_warning:
+            warning_text = render_text(self.font_size, "WARNING: Boss approaching!", (255, 50, 50))
+            text_rect = warning_text.get_rect(center=(self.width // 2, 50))
+            self._draw_hud(warning_text, text_rect)
+
+        # Draw game cleared message
+        if hud.game_cleared:
+            victory_text = render_text(self.font_size, "GAME CLEARED!", (50, 255, 50))
+            text_rect = victory_text.get_rect(center=(self.width // 2, self.height // 2 - 40))
+            self._draw_hud(victory_text, text_rect)
+
+            score_text = render_text(self.font_size, f"Final Score: {hud.score}", (255, 255, 255))
+            score_rect = score_text.get_rect(center=(self.width // 2, self.height // 2))
+            self._draw_hud(score_text, score_rect)
+
+            restart_text = render_text(self.font_size, "Press R to return to menu", (255, 255, 255))
+            restart_rect = restart_text.get_rect(center=(self.width // 2, self.height // 2 + 40))
+            self._draw_hud(restart_text, restart_rect)
+
+        # Draw game over message
+        elif hud.game_over:
+            game_over_text = render_text(self.font_size, "GAME OVER", (255, 0, 0))
+            text_rect = game_over_text.get_rect(center=(self.width // 2, self.height // 2 - 20))
+            self._draw_hud(game_over_text, text_rect)
+
+            restart_text = render_text(self.font_size, "Press R to restart", (255, 255, 255))
+            restart_rect = restart_text.get_rect(center=(self.width // 2, self.height // 2 + 20))
+            self._draw_hud(restart_text, restart_rect)
+
+        # Draw pause message
+        if hud.paused and not (hud.game_over or hud.game_cleared):
+            paused_text = render_text(self.font_size, "PAUSED", (255, 255, 255))
+            self._draw_hud(paused_text, paused_text.get_rect(center=(self.width // 2, self.height // 2)))
+
+        # Draw debug info
+        if hud.debug is not None:
+            debug_text = render_text(24, hud.debug, (180, 255, 180))
+            self._draw_hud(debug_text, debug_text.get_rect(bottomright=(self.width - 10, self.height - 40)))
+
+        # Draw profiler overlay
+        if hud.profile is not None:
+            self._draw_profile(hud.profile)
+
+        # 静止画面になったら画像を保存しておく
+        if snapshot.idle:
+            self.static_frame = screen.copy()
+            self.static_hud = hud
+            self.static_frame_shown = True
+        else:
+            self.static_frame = None
+
+        rects = self.dirty_rects.finish() if self.dirty_rects is not None else None
+        # 垂直同期で待つ時間は品質の判断に使わないので、表示の前までを計測する
+        render_ms = (time.perf_counter() - start) * 1000
+        return RenderedFrame(screen, rects, render_ms, timer.finish())
+
+    def _draw_glow(self, snapshot):
+        """グローを集めて1回の blits で合成（上限を超えた分は描かない）"""
+        if self.glow.max_sprites == 0:
+            return
+        glow = self.glow
+        if snapshot.boss is not None:
+            snapshot.boss.add_glow(glow)
+        snapshot.player.add_glow(glow)
+        for effect in snapshot.hit_effects:
+            glow.add((255, 140, 0), effect['radius'] + 10, effect['x'], effect['y'])
+        for bullets, color in ((snapshot.enemy_bullets, (255, 40, 40)), (snapshot.player_bullets, (255, 200, 0))):
+            for bullet in bullets:
+                if not glow.add(color, 10, bullet.x, bullet.y):
+                    break
+        glow.flush(self.surface)
+
+    def _collect_draw_rects(self, snapshot):
+        """今フレームで描画するエンティティの範囲を集める"""
+        rects = snapshot.terrain.get_draw_rects()
+        rects.extend(snapshot.player.get_draw_rects())
+        if snapshot.boss is not None:
+            rects.extend(snapshot.boss.get_draw_rects())
+        for group in (snapshot.enemies, snapshot.powerups, snapshot.player_bullets, snapshot.enemy_bullets):
+            for entity in group:
+                rects.extend(entity.get_draw_rects())
+        for effect in snapshot.hit_effects:
+            radius = effect['max_radius'] + 2
+            rects.append(pygame.Rect(effect['x'] - radius, effect['y'] - radius, radius * 2, radius * 2))
+        for bomb in snapshot.bombs:
+            radius = bomb['radius'] + 4
+            rects.append(pygame.Rect(bomb['x'] - radius, bomb['y'] - radius, radius * 2, radius * 2))
+        return rects
+
+    def _draw_profile(self, lines):
+        """区間ごとの処理時間のオーバーレイをスコアの下に描画"""
+        y = 105
+        for line in lines:
+            text = render_text(20, line, (255, 255, 180))
+            self._draw_hud(text, (10, y))
+            y += text.get_height()
+
+    def _draw_hud(self, surface, dest):
+        """HUD の文字列を描画し、差分矩形描画の対象に加える"""
+        rect = self.surface.blit(surface, dest)
+        if self.dirty_rects is not None:
+            self.dirty_rects.add(rect)
+
+    def _draw_powerup_status(self, powerups):
+        # Draw powerup status at the bottom of the screen
+        status_y = self.height - 30
+
+        # Multi-shot status
+        if powerups["multi_shot"] > 0:
+            text = render_text(24, f"Multi-Shot: {powerups['multi_shot'] // 60}s", (255, 255, 0))
+            self._draw_hud(text, (10, status_y))
+
+        # Diagonal-shot status
+        if powerups["diagonal_shot"] > 0:
+            text = render_text(24, f"Diag-Shot: {powerups['diagonal_shot'] // 60}s", (0, 255, 255))
+            self._draw_hud(text, (150, status_y))
+
+        # Speed-up status
+        if powerups["speed_up"] > 0:
+            text = render_text(24, f"Speed-Up: {powerups['speed_up'] // 60}s", (0, 255, 0))
+            self._draw_hud(text, (290, status_y))
+
+        # Shield status
+        if powerups["shield"] > 0:
+            text = render_text(24, f"Shield: {powerups['shield'] // 60}s", (100, 100, 255))
+            self._draw_hud(text, (430, status_y))
+
+    def _draw_hit_effects(self, screen, hit_effects):
+        """ヒットエフェクトを描画（事前に生成したフレームを1回ずつ blit）"""
+        inner_ring = self.quality["hit_inner_ring"]
+        for effect in hit_effects:
+            frames = hit_effect_frames(effect['max_radius'], effect['duration'], inner_ring)
+            blit_centered(screen, frames[effect['timer']], effect['x'], effect['y'])
@@ -0,0 +1,157 @@
+import copy
+import threading
+from collections import namedtuple
+
+# 1フレーム分の描画状態。シミュレーションが update の後に作成し、以降は変更しない
+FrameSnapshot = namedtuple("FrameSnapshot", [
+    "idle",            # 静止画面（ゲームオーバー・クリア・一時停止）か
+    "starfield",
+    "terrain",
+    "player",
+    "boss",
+    "enemies",
+    "powerups",
+    "player_bullets",
+    "enemy_bullets",
+    "hit_effects",
+    "bombs",
+    "quality",         # 品質レベルの設定（描画側はグローとヒットエフェクトに使う）
+    "redraw",          # 描き直しの要求の回数（変わったら画面全体を描き直す）
+    "hud"
+])
+
+# HUD に表示する値
+HudState = namedtuple("HudState", [
+    "score", "difficulty", "graze_count", "powerups",
+    "boss_warning", "game_cleared", "game_over", "paused",
+    "debug",  # デバッグ表示の文字列（非表示なら None）
+    "profile"  # 区間ごとの処理時間のオーバーレイの行（非表示なら None）
+])
+
+def freeze(entity):
+    """描画に必要な状態をシミュレーションから切り離したコピーを作成
+
+    update で中身を書き換える属性（リストや配列など）を持つクラスは snapshot() を定義する。
+    それ以外は数値や文字列を付け替えるだけなので浅いコピーで十分。
+    """
+    if entity is None:
+        return None
+    snapshot = getattr(entity, "snapshot", None)
+    if snapshot is not None:
+        return snapshot()
+    return copy.copy(entity)
+
+def freeze_all(entities):
+    return tuple(freeze(entity) for entity in entities)
+
+class RenderThread:
+    """シミュレーションが公開したスナップショットを別スレッドで描画する
+
+    スナップショットは2つのバッファでやり取りする。シミュレーションは裏のバッファに
+    最新のスナップショットを書き込み、描画スレッドは表と裏を入れ替えてから描画する。
+    描画が追いつかない場合は古いスナップショットを上書きする（そのフレームは描画しない）。
+    pygame の blit の間は GIL が解放されるため、描画と次の update が並行して進む。
+
+    描画スレッドは描画面に描くだけで、画面への表示（flip）は SDL の制約に合わせて
+    ウィンドウを作ったメインスレッドが present_ready() で行う。描き終えたフレームは
+    同じ描画面を使うので、それが表示されるまで描画スレッドは次のフレームを描かない。
+    """
+    def __init__(self, render, present):
+        self.render = render  # スナップショットを受け取って描画し、表示するフレーム（なければ None）を返す関数
+        self.present = present  # 描き終えたフレームを表示する関数（メインスレッドで呼ぶ）
+        self.buffers = [None, None]
+        self.front = 0  # 描画スレッドが使っているバッファ
+        self.ready = None  # 描き終えて表示を待っているフレーム
+        self.condition = threading.Condition()
+        self.busy = False
+        self.running = False
+        self.thread = None
+        self.error = None
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="render", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """描画中のフレームを描き終えてからスレッドを止める"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self._raise_error()
+
+    def publish(self, snapshot):
+        """最新のスナップショットを裏のバッファに置く（シミュレーション側から呼ぶ）"""
+        self._raise_error()
+        with self.condition:
+            back = 1 - self.front
+            if self.buffers[back] is not None:
+                self.frames_dropped += 1
+            self.buffers[back] = snapshot
+            self.condition.notify_all()
+
+    def present_ready(self):
+        """描き終えたフレームがあれば表示する（メインスレッドから呼ぶ）"""
+        self._raise_error()
+        with self.condition:
+            frame = self.ready
+        if frame is None:
+            return
+        self.present(frame)
+        # 表示が終わってから描画面を描画スレッドに返す
+        with self.condition:
+            self.ready = None
+            self.condition.notify_all()
+
+    def wait(self):
+        """公開済みのスナップショットをすべて描画して表示し終えるまで待つ
+
+        ゲームの作り直しやメニュー画面の描画など、描画スレッドと同じ Display や
+        Game を触る前に呼ぶ（メインスレッドから呼ぶ）。
+        """
+        while True:
+            with self.condition:
+                while (self.running and self.ready is None
+                       and (self.busy or self.buffers[1 - self.front] is not None)):
+                    self.condition.wait()
+                if self.ready is None:
+                    break
+            self.present_ready()
+        self._raise_error()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and (self.buffers[1 - self.front] is None or self.ready is not None):
+                    self.condition.wait()
+                if not self.running:
+                    return
+                # 表と裏を入れ替え、新しい裏のバッファを空にする
+                self.front = 1 - self.front
+                snapshot = self.buffers[self.front]
+                self.buffers[1 - self.front] = None
+                self.busy = True
+            frame = None
+            try:
+                frame = self.render(snapshot)
+                self.frames_rendered += 1
+            except Exception as e:
+                self.error = e
+                self.running = False
+            finally:
+                with self.condition:
+                    self.ready = frame
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("Render thread failed") from error
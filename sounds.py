@@ -1,35 +1,185 @@
 import pygame
 import os
+import threading
 import numpy as np
+from synth import NoteTable, Beat, GAUSS, DECAY, NOISE
+from music import MusicTrack, MusicStreamer
+
+# ミキサーの設定（合成する波形と同じサンプリングレートで、遅延の少ない小さなバッファ）
+MIXER_FREQUENCY = 22050
+MIXER_BUFFER = 512
+MIXER_CHANNELS = 16
+MUSIC_CHANNEL = 0  # BGM 専用に予約するチャンネル（効果音には使わせない）
+PAN_BUCKETS = 8  # 効果音ごとに用意する左右の定位の段階数
+
+# 効果音ごとの同時発音数の上限
+VOICE_LIMITS = {
+    'shoot': 2,
+    'explosion': 3,
+    'boss_hit': 2,
+    'powerup': 1,
+    'boss_appear': 1,
+    'boss_defeat': 1
+}
+
+def pre_init_mixer(frequency=MIXER_FREQUENCY, buffer=MIXER_BUFFER):
+    """pygame.init() より前に呼び、ミキサーを合成する波形に合わせた設定で初期化させる"""
+    pygame.mixer.pre_init(frequency, -16, 2, buffer)
+
+def _normalize(samples):
+    max_val = np.max(np.abs(samples))
+    if max_val > 0:
+        samples = samples / max_val
+    return samples
+
+def bgm_layers(duration=10.0):
+    """通常BGM (より明るく爽快な曲調に変更) のレイヤー: (鳴らし始める強さ, 音源) のリスト"""
+    # ベースリズム (よりテンポアップ)
+    beat = Beat(4.5, 0.3)  # beats per second (4から4.5に増加)
+    
+    # ベースライン (より明るい音階を使用)
+    bass = NoteTable()
+    bass.add_pattern([262, 330, 392, 349], 4.0, duration, 0.3)  # C4, E4, G4, F4 (明るい長調)
+    
+    # メロディ (より明るく軽快なメロディ)
+    melody = NoteTable()
+    melody.add_pattern([523, 587, 659, 698, 784, 698, 659, 587], 8.0, duration, 0.25,  # C5〜G5
+                       GAUSS, k=3, center=0.5)
+    
+    # 高音部の装飾 (より明るいアルペジオ、短い音符のエンベロープ)
+    high = NoteTable()
+    high.add_pattern([784, 880, 988, 1047, 1175, 1047, 988, 880], 4.0, duration, 0.2,  # G5〜D6
+                     GAUSS, k=8, center=0.2)
+    
+    # 明るい効果音 (0.5秒ごとの短い音)
+    bright_fx = NoteTable()
+    fx_notes = [1047, 1175, 1319, 1397]  # C6, D6, E6, F6
+    for time_point in np.arange(0.25, duration, 0.5):
+        bright_fx.add(time_point, 0.1, fx_notes[int(time_point * 2) % len(fx_notes)], 0.15, DECAY, k=12)
+    
+    return [(0, beat), (0, bass), (0, melody), (0, high), (0, bright_fx)]
+
+def boss_bgm_layers(duration=10.0):
+    """ボス戦BGM (より盛り上がる感じに変更) のレイヤー: (鳴らし始める強さ, 音源) のリスト
+
+    強さ 0〜3 はボスのフェーズ（とプレイヤーの残りHP）に応じて上がり、レイヤーが重なっていく。
+    """
+    # 速いビート (よりテンポアップ)
+    boss_beat = Beat(6, 0.5)  # 速いビート (5から6に増加)
+    
+    # 力強いベースライン
+    boss_bass = NoteTable()
+    boss_bass.add_pattern([196, 233, 196, 175], 4.0, duration, 0.45)  # G3, A#3, G3, F3
+    
+    # 盛り上がるメロディ (より強いアタックのエンベロープ)
+    boss_melody = NoteTable()
+    boss_melody.add_pattern([392, 466, 523, 622, 587, 523, 466, 392], 8.0, duration, 0.35,  # G4〜D#5
+                            GAUSS, k=4, center=0.3)
+    
+    # 高音部の効果音 (不規則なリズムで高音を鳴らす)
+    boss_fx = NoteTable()
+    boss_fx_notes = [784, 740, 784, 831, 784, 740, 698, 659]  # G5, F#5, G5, G#5, G5, F#5, F5, E5
+    fx_pattern = [0.3, 0.5, 0.7, 1.0, 1.2, 1.5, 1.8, 2.0, 2.3, 2.5, 2.8, 3.0, 3.3, 3.5, 3.8, 4.0,
+                  4.3, 4.5, 4.8, 5.0, 5.3, 5.5, 5.8, 6.0, 6.3, 6.5, 6.8, 7.0, 7.3, 7.5, 7.8, 8.0,
+                  8.3, 8.5, 8.8, 9.0, 9.3, 9.5, 9.8]
+    for time_point in fx_pattern:
+        if time_point < duration:
+            note = boss_fx_notes[int(time_point * 4) % len(boss_fx_notes)]
+            boss_fx.add(time_point, 0.1, note, 0.25, DECAY, k=15)
+    
+    # ドラム風の効果音 (ノイズベース、0.5秒ごと)
+    drums = NoteTable()
+    for time_point in np.arange(0.0, duration, 0.5):
+        drums.add(time_point, 0.05, 0, 0.4, DECAY, k=30, wave=NOISE)
+    
+    return [(0, boss_beat), (0, boss_bass), (0, boss_melody), (1, boss_fx), (2, drums)]
+
+def boss_drive(intensity):
+    """ボス戦BGMの歪みの強さ（強さ 3 でさらに歪ませる）"""
+    return 2.6 if intensity >= 3 else 1.8
+
+def render_bgm(sample_rate=22050, duration=10.0):
+    """通常BGMのループ全体の波形"""
+    layers = bgm_layers(duration)
+    return _normalize(sum(source.render(duration, sample_rate) for _, source in layers))
+
+def render_boss_bgm(sample_rate=22050, duration=10.0, seed=None):
+    """ボス戦BGMのループ全体の波形（全レイヤー）"""
+    layers = boss_bgm_layers(duration)
+    boss_bgm = sum(source.render(duration, sample_rate, seed) for _, source in layers)
+    
+    # 歪みを加えて迫力を出してから正規化
+    return _normalize(np.tanh(boss_bgm * 1.8) * 0.8)
 
 class SoundManager:
-    def __init__(self):
-        # Initialize pygame mixer
-        pygame.mixer.init()
+    def __init__(self, sample_rate=MIXER_FREQUENCY, buffer=MIXER_BUFFER, pan_width=800):
+        # Initialize pygame mixer (初期化済みならその設定に合わせて合成する)
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(sample_rate, -16, 2, buffer)
+        sample_rate = pygame.mixer.get_init()[0]
+        
+        # BGM 用のチャンネルを予約し、効果音は残りのチャンネルで鳴らす
+        pygame.mixer.set_num_channels(MIXER_CHANNELS)
+        pygame.mixer.set_reserved(MUSIC_CHANNEL + 1)
+        self.music_channel = pygame.mixer.Channel(MUSIC_CHANNEL)
         
         # Sound effects dictionary
         self.sounds = {}
+        self.panned_sounds = {}  # 効果音名 -> 左から右へ定位を変えた PAN_BUCKETS 個の Sound
+        self.pan_width = pan_width  # 画面の幅（x 座標を定位に変換する）
+        self.sample_rate = sample_rate
         
-        # Music state
+        # このフレームに鳴らす効果音（同じ音は1回にまとめる）: 効果音名 -> x 座標
+        self.queued_sounds = {}
+        
+        # Music state (BGM は1秒ずつ合成しながら流す)
         self.current_music = None
+        self.tracks = {
+            'bgm': MusicTrack('bgm', bgm_layers(), volume=0.45),
+            'boss_bgm': MusicTrack('boss_bgm', boss_bgm_layers(), volume=0.5,  # ボス戦はやや大きめの音量
+                                   shaper=lambda samples, intensity: np.tanh(samples * boss_drive(intensity)))
+        }
+        self.music = MusicStreamer(self.music_channel, sample_rate)
         
-        # Create simple sounds directly in memory
-        self._create_sounds()
+        # 効果音の生成はバックグラウンドで行い、最初のフレームを待たせない
+        self.loader = threading.Thread(target=self._create_sounds, name="sound-loader", daemon=True)
+        self.loader.start()
+    
+    def is_loaded(self):
+        return not self.loader.is_alive()
+    
+    def wait_until_loaded(self, timeout=None):
+        """全ての効果音の生成が終わるまで待つ"""
+        self.loader.join(timeout)
+        return self.is_loaded()
+    
+    def _add_effect(self, name, samples, volume):
+        """モノラルの波形から、中央と定位を変えた PAN_BUCKETS 個の効果音を作る"""
+        variants = []
+        for pan in np.linspace(-1, 1, PAN_BUCKETS):
+            # 中央は元の音量のまま、反対側のチャンネルだけを絞る
+            left = samples * min(1.0, 1 - pan)
+            right = samples * min(1.0, 1 + pan)
+            variants.append(self._make_sound(np.column_stack((left, right)), volume))
+        self.sounds[name] = self._make_sound(np.column_stack((samples, samples)), volume)
+        self.panned_sounds[name] = variants
+    
+    def _make_sound(self, stereo, volume):
+        sound = pygame.sndarray.make_sound((stereo * 32767).astype(np.int16))
+        sound.set_volume(volume)
+        return sound
     
     def _create_sounds(self):
         """Create simple sound effects directly in memory"""
         try:
             # Shoot sound (short beep)
-            sample_rate = 22050
+            sample_rate = self.sample_rate
             
             # Shoot sound
             duration = 0.1
             t = np.linspace(0, duration, int(sample_rate * duration), False)
             shoot_sound = np.sin(2 * np.pi * 440 * t) * 0.5
-            shoot_sound = np.column_stack((shoot_sound, shoot_sound))
-            shoot_sound = (shoot_sound * 32767).astype(np.int16)
-            self.sounds['shoot'] = pygame.sndarray.make_sound(shoot_sound)
-            self.sounds['shoot'].set_volume(0.3)
+            self._add_effect('shoot', shoot_sound, 0.3)
             
             # Explosion sound
             duration = 0.5
@@ -37,40 +187,28 @@ class SoundManager:
             noise = np.random.uniform(-1, 1, len(t))
             decay = np.exp(-5 * t)
             explosion_sound = noise * decay
-            explosion_sound = np.column_stack((explosion_sound, explosion_sound))
-            explosion_sound = (explosion_sound * 32767).astype(np.int16)
-            self.sounds['explosion'] = pygame.sndarray.make_sound(explosion_sound)
-            self.sounds['explosion'].set_volume(0.5)
+            self._add_effect('explosion', explosion_sound, 0.5)
             
             # Powerup sound
             duration = 0.3
             t = np.linspace(0, duration, int(sample_rate * duration), False)
             freq = np.linspace(300, 1200, len(t))
             powerup_sound = np.sin(2 * np.pi * freq * t / sample_rate * 1000)
-            powerup_sound = np.column_stack((powerup_sound, powerup_sound))
-            powerup_sound = (powerup_sound * 32767).astype(np.int16)
-            self.sounds['powerup'] = pygame.sndarray.make_sound(powerup_sound)
-            self.sounds['powerup'].set_volume(0.7)
+            self._add_effect('powerup', powerup_sound, 0.7)
             
             # Boss hit sound
             duration = 0.2
             t = np.linspace(0, duration, int(sample_rate * duration), False)
             freq = np.linspace(200, 50, len(t))
             boss_hit = np.sin(2 * np.pi * freq * t / sample_rate * 500) * np.exp(-10 * t)
-            boss_hit = np.column_stack((boss_hit, boss_hit))
-            boss_hit = (boss_hit * 32767).astype(np.int16)
-            self.sounds['boss_hit'] = pygame.sndarray.make_sound(boss_hit)
-            self.sounds['boss_hit'].set_volume(0.4)
+            self._add_effect('boss_hit', boss_hit, 0.4)
             
             # Boss appear sound
             duration = 1.0
             t = np.linspace(0, duration, int(sample_rate * duration), False)
             boss_appear = np.sin(2 * np.pi * 150 * t) * 0.5 + np.sin(2 * np.pi * 153 * t) * 0.5
             boss_appear = boss_appear * np.exp(-2 * t)
-            boss_appear = np.column_stack((boss_appear, boss_appear))
-            boss_appear = (boss_appear * 32767).astype(np.int16)
-            self.sounds['boss_appear'] = pygame.sndarray.make_sound(boss_appear)
-            self.sounds['boss_appear'].set_volume(0.8)
+            self._add_effect('boss_appear', boss_appear, 0.8)
             
             # Boss defeat sound
             duration = 1.5
@@ -81,244 +219,77 @@ class SoundManager:
             if fanfare_idx < len(t):
                 fanfare[fanfare_idx:] = np.sin(2 * np.pi * 440 * t[:len(t)-fanfare_idx]) * 0.7
             boss_defeat = noise + fanfare
-            boss_defeat = np.column_stack((boss_defeat, boss_defeat))
-            boss_defeat = (boss_defeat * 32767).astype(np.int16)
-            self.sounds['boss_defeat'] = pygame.sndarray.make_sound(boss_defeat)
-            self.sounds['boss_defeat'].set_volume(0.8)
-            
-            # Create BGM
-            self._create_bgm()
+            self._add_effect('boss_defeat', boss_defeat, 0.8)
             
         except Exception as e:
             print(f"Error creating sounds: {e}")
     
-    def _create_bgm(self):
-        """Create background music directly in memory"""
+    def play_sound(self, sound_name, x=None):
+        """Play a sound effect once
+
+        x（画面上の横位置）を渡すと、最も近い定位の効果音を鳴らす。
+        同時発音数の上限に達していたら鳴らさない。
+        """
+        variants = self.panned_sounds.get(sound_name)
+        if variants is None:
+            return
         try:
-            sample_rate = 22050
-            duration = 10.0  # 10 seconds loop
-            t = np.linspace(0, duration, int(sample_rate * duration), False)
-            
-            # --- 通常BGM (より明るく爽快な曲調に変更) ---
-            
-            # ベースリズム (よりテンポアップ)
-            beat_freq = 4.5  # beats per second (4から4.5に増加)
-            beat = 0.3 * np.sin(2 * np.pi * beat_freq * t)
-            beat = beat * (beat > 0)  # Keep only positive parts
-            
-            # ベースライン (より明るい音階を使用)
-            bass_notes = [262, 330, 392, 349]  # C4, E4, G4, F4 (明るい長調)
-            bass_pattern_duration = 4.0  # seconds per pattern
-            bass = np.zeros_like(t)
-            
-            for i in range(int(duration / bass_pattern_duration)):
-                start_idx = int(i * bass_pattern_duration * sample_rate)
-                for j, note in enumerate(bass_notes):
-                    note_start = start_idx + int(j * bass_pattern_duration / len(bass_notes) * sample_rate)
-                    note_end = min(start_idx + int((j + 1) * bass_pattern_duration / len(bass_notes) * sample_rate), len(t))
-                    if note_start < len(t) and note_end > note_start:
-                        note_t = t[note_start:note_end] - t[note_start]
-                        bass[note_start:note_end] += 0.3 * np.sin(2 * np.pi * note * note_t)  # 0.25から0.3に増加
-            
-            # メロディ (より明るく軽快なメロディ)
-            melody_notes = [523, 587, 659, 698, 784, 698, 659, 587]  # C5, D5, E5, F5, G5, F5, E5, D5
-            melody_pattern_duration = 8.0  # seconds per pattern
-            melody = np.zeros_like(t)
-            
-            for i in range(int(duration / melody_pattern_duration)):
-                start_idx = int(i * melody_pattern_duration * sample_rate)
-                for j, note in enumerate(melody_notes):
-                    note_start = start_idx + int(j * melody_pattern_duration / len(melody_notes) * sample_rate)
-                    note_end = min(start_idx + int((j + 1) * melody_pattern_duration / len(melody_notes) * sample_rate), len(t))
-                    if note_start < len(t) and note_end > note_start:
-                        note_t = t[note_start:note_end] - t[note_start]
-                        if len(note_t) > 0:
-                            envelope = np.exp(-3 * (note_t - 0.5 * (note_t[-1] - note_t[0])) ** 2 / max(0.0001, (note_t[-1] - note_t[0])) ** 2)
-                            melody[note_start:note_end] += 0.25 * np.sin(2 * np.pi * note * note_t) * envelope  # 0.2から0.25に増加
-            
-            # 高音部の装飾 (より明るいアルペジオ)
-            high_notes = [784, 880, 988, 1047, 1175, 1047, 988, 880]  # G5, A5, B5, C6, D6, C6, B5, A5
-            high_pattern_duration = 4.0
-            high_melody = np.zeros_like(t)
-            
-            # 高音部の装飾をより多く
-            for i in range(int(duration / high_pattern_duration)):
-                start_idx = int(i * high_pattern_duration * sample_rate)
-                for j, note in enumerate(high_notes):
-                    note_start = start_idx + int(j * high_pattern_duration / len(high_notes) * sample_rate)
-                    note_end = min(start_idx + int((j + 1) * high_pattern_duration / len(high_notes) * sample_rate), len(t))
-                    if note_start < len(t) and note_end > note_start:
-                        note_t = t[note_start:note_end] - t[note_start]
-                        if len(note_t) > 0:
-                            # 短い音符のエンベロープ
-                            envelope = np.exp(-8 * (note_t - 0.2 * (note_t[-1] - note_t[0])) ** 2 / max(0.0001, (note_t[-1] - note_t[0])) ** 2)
-                            high_melody[note_start:note_end] += 0.2 * np.sin(2 * np.pi * note * note_t) * envelope  # 0.15から0.2に増加
-            
-            # 明るい効果音を追加
-            bright_fx = np.zeros_like(t)
-            fx_pattern = [0.25, 0.75, 1.25, 1.75, 2.25, 2.75, 3.25, 3.75, 4.25, 4.75, 5.25, 5.75, 6.25, 6.75, 7.25, 7.75, 8.25, 8.75, 9.25, 9.75]
-            for time_point in fx_pattern:
-                if time_point < duration:
-                    idx = int(time_point * sample_rate)
-                    # 明るい効果音の音符
-                    fx_notes = [1047, 1175, 1319, 1397]  # C6, D6, E6, F6
-                    note = fx_notes[int(time_point * 2) % len(fx_notes)]
-                    
-                    # 短い効果音
-                    note_duration = 0.1
-                    end_idx = min(idx + int(note_duration * sample_rate), len(t))
-                    if idx < len(t):
-                        note_t = np.arange(end_idx - idx) / sample_rate
-                        envelope = np.exp(-12 * note_t)
-                        bright_fx[idx:end_idx] += 0.15 * np.sin(2 * np.pi * note * note_t) * envelope
-            
-            # トラックを結合
-            bgm = beat + bass + melody + high_melody + bright_fx
-            
-            # 正規化
-            max_val = np.max(np.abs(bgm))
-            if max_val > 0:
-                bgm = bgm / max_val
-            
-            # ステレオに変換
-            bgm_stereo = np.column_stack((bgm, bgm))
-            
-            # 16-bit PCMに変換
-            bgm_stereo = (bgm_stereo * 32767).astype(np.int16)
-            
-            # サウンドオブジェクトを作成
-            self.sounds['bgm'] = pygame.sndarray.make_sound(bgm_stereo)
-            self.sounds['bgm'].set_volume(0.45)  # 0.4から0.45に増加
-            
-            # --- ボス戦BGM (より盛り上がる感じに変更) ---
-            
-            # 速いビート (よりテンポアップ)
-            boss_beat_freq = 6  # 速いビート (5から6に増加)
-            boss_beat = 0.5 * np.sin(2 * np.pi * boss_beat_freq * t)
-            boss_beat = boss_beat * (boss_beat > 0)
-            
-            # 力強いベースライン
-            boss_bass_notes = [196, 233, 196, 175]  # G3, A#3, G3, F3
-            boss_bass = np.zeros_like(t)
-            
-            for i in range(int(duration / bass_pattern_duration)):
-                start_idx = int(i * bass_pattern_duration * sample_rate)
-                for j, note in enumerate(boss_bass_notes):
-                    note_start = start_idx + int(j * bass_pattern_duration / len(boss_bass_notes) * sample_rate)
-                    note_end = min(start_idx + int((j + 1) * bass_pattern_duration / len(boss_bass_notes) * sample_rate), len(t))
-                    if note_start < len(t):
-                        note_t = t[note_start:note_end] - t[note_start]
-                        # より強いベース音
-                        boss_bass[note_start:note_end] += 0.45 * np.sin(2 * np.pi * note * note_t)
-            
-            # 盛り上がるメロディ
-            boss_melody_notes = [392, 466, 523, 622, 587, 523, 466, 392]  # G4, A#4, C5, D#5, D5, C5, A#4, G4
-            boss_melody = np.zeros_like(t)
-            
-            for i in range(int(duration / melody_pattern_duration)):
-                start_idx = int(i * melody_pattern_duration * sample_rate)
-                for j, note in enumerate(boss_melody_notes):
-                    note_start = start_idx + int(j * melody_pattern_duration / len(boss_melody_notes) * sample_rate)
-                    note_end = min(start_idx + int((j + 1) * melody_pattern_duration / len(boss_melody_notes) * sample_rate), len(t))
-                    if note_start < len(t) and note_end > note_start:
-                        note_t = t[note_start:note_end] - t[note_start]
-                        if len(note_t) > 0:
-                            # より強いアタックのエンベロープ
-                            envelope = np.exp(-4 * (note_t - 0.3 * (note_t[-1] - note_t[0])) ** 2 / max(0.0001, (note_t[-1] - note_t[0])) ** 2)
-                            boss_melody[note_start:note_end] += 0.35 * np.sin(2 * np.pi * note * note_t) * envelope
-            
-            # 高音部の効果音 (より派手に)
-            boss_fx_notes = [784, 740, 784, 831, 784, 740, 698, 659]  # G5, F#5, G5, G#5, G5, F#5, F5, E5
-            boss_fx = np.zeros_like(t)
-            
-            # 不規則なリズムで高音を鳴らす (より多く)
-            fx_pattern = [0.3, 0.5, 0.7, 1.0, 1.2, 1.5, 1.8, 2.0, 2.3, 2.5, 2.8, 3.0, 3.3, 3.5, 3.8, 4.0,
-                         4.3, 4.5, 4.8, 5.0, 5.3, 5.5, 5.8, 6.0, 6.3, 6.5, 6.8, 7.0, 7.3, 7.5, 7.8, 8.0,
-                         8.3, 8.5, 8.8, 9.0, 9.3, 9.5, 9.8]
-            for time_point in fx_pattern:
-                if time_point < duration:
-                    idx = int(time_point * sample_rate)
-                    note_idx = int(time_point * 4) % len(boss_fx_notes)
-                    note = boss_fx_notes[note_idx]
-                    
-                    # 短い効果音
-                    note_duration = 0.1
-                    end_idx = min(idx + int(note_duration * sample_rate), len(t))
-                    if idx < len(t):
-                        note_t = np.arange(end_idx - idx) / sample_rate
-                        envelope = np.exp(-15 * note_t)
-                        boss_fx[idx:end_idx] += 0.25 * np.sin(2 * np.pi * note * note_t) * envelope
-            
-            # ドラム風の効果音を追加
-            drum_pattern = [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5]
-            drum_sound = np.zeros_like(t)
-            for time_point in drum_pattern:
-                if time_point < duration:
-                    idx = int(time_point * sample_rate)
-                    # ドラム音の長さ
-                    drum_duration = 0.05
-                    end_idx = min(idx + int(drum_duration * sample_rate), len(t))
-                    if idx < len(t):
-                        # ノイズベースのドラム音
-                        drum_t = np.arange(end_idx - idx) / sample_rate
-                        noise = np.random.uniform(-1, 1, len(drum_t))
-                        envelope = np.exp(-30 * drum_t)
-                        drum_sound[idx:end_idx] += 0.4 * noise * envelope
-            
-            # ボスBGMのトラックを結合
-            boss_bgm = boss_beat + boss_bass + boss_melody + boss_fx + drum_sound
-            
-            # 歪みを加えて迫力を出す
-            boss_bgm = np.tanh(boss_bgm * 1.8) * 0.8
-            
-            # 正規化
-            max_val = np.max(np.abs(boss_bgm))
-            if max_val > 0:
-                boss_bgm = boss_bgm / max_val
-            
-            # ステレオに変換
-            boss_bgm_stereo = np.column_stack((boss_bgm, boss_bgm))
-            
-            # 16-bit PCMに変換
-            boss_bgm_stereo = (boss_bgm_stereo * 32767).astype(np.int16)
-            
-            # サウンドオブジェクトを作成
-            self.sounds['boss_bgm'] = pygame.sndarray.make_sound(boss_bgm_stereo)
-            self.sounds['boss_bgm'].set_volume(0.5)  # ボス戦はやや大きめの音量
-            
+            voices = self.sounds[sound_name].get_num_channels() + sum(v.get_num_channels() for v in variants)
+            if voices >= VOICE_LIMITS.get(sound_name, 2):
+                return
+            if x is None:
+                self.sounds[sound_name].play()
+            else:
+                # 定位は linspace(-1, 1) で作ってあるので、最も近い定位の音を選ぶ
+                bucket = round(x / self.pan_width * (PAN_BUCKETS - 1))
+                variants[min(max(bucket, 0), PAN_BUCKETS - 1)].play()
         except Exception as e:
-            print(f"Error creating BGM: {e}")
+            print(f"Error playing sound {sound_name}: {e}")
     
-    def play_sound(self, sound_name):
-        """Play a sound effect once"""
-        if sound_name in self.sounds:
-            try:
-                self.sounds[sound_name].play()
-            except Exception as e:
-                print(f"Error playing sound {sound_name}: {e}")
+    def queue_sound(self, sound_name, x=None):
+        """効果音をこのフレームの再生キューに追加（flush_sounds でまとめて鳴らす）
+
+        同じフレームに同じ効果音が複数回追加されたときは最初の位置で1回だけ鳴らす。
+        """
+        if sound_name not in self.queued_sounds:
+            self.queued_sounds[sound_name] = x
+    
+    def flush_sounds(self):
+        """キューの効果音を1回ずつ鳴らす（フレームの最後に1回呼ぶ）"""
+        if self.queued_sounds:
+            for sound_name, x in self.queued_sounds.items():
+                self.play_sound(sound_name, x)
+            self.queued_sounds.clear()
     
     def play_music(self, music_name):
-        """Play background music in a loop"""
+        """Play background music in a loop (最初のチャンクが合成され次第鳴り始める)"""
         if self.current_music == music_name:
             return  # Already playing this music
-            
-        try:
-            if music_name in self.sounds:
-                # Stop any currently playing music
-                pygame.mixer.stop()
-                
-                # Play the new music in a loop
-                self.sounds[music_name].play(-1)  # -1 means loop indefinitely
-                self.current_music = music_name
-            else:
-                print(f"Music not found: {music_name}")
-        except Exception as e:
-            print(f"Error playing music: {e}")
+        
+        track = self.tracks.get(music_name)
+        if track is None:
+            print(f"Music not found: {music_name}")
+            return
+        self.music.play(track)
+        self.current_music = music_name
+    
+    def set_music_intensity(self, intensity):
+        """BGM の強さ（0〜3）。重ねるレイヤーが次のチャンクから変わる"""
+        self.music.set_intensity(intensity)
+    
+    def update(self):
+        """BGM の次のチャンクを予約（毎フレーム呼ぶ）"""
+        self.music.update()
     
     def stop_music(self):
         """Stop the currently playing music"""
         try:
-            pygame.mixer.stop()
+            self.music.play(None)
             self.current_music = None
         except Exception as e:
             print(f"Error stopping music: {e}")
+    
+    def close(self):
+        """BGM のワーカーを止める"""
+        self.stop_music()
+        self.music.close()
@@ -0,0 +1,32 @@
+import numpy as np
+from itertools import compress
+
+def centers(objects):
+    """オブジェクトの中心座標を NumPy 配列でまとめて取得"""
+    count = len(objects)
+    xs = np.fromiter((obj.x + obj.width / 2 for obj in objects), dtype=float, count=count)
+    ys = np.fromiter((obj.y + obj.height / 2 for obj in objects), dtype=float, count=count)
+    return xs, ys
+
+def flag_mask(objects, name):
+    """各オブジェクトの真偽値属性 name をマスク配列として取得"""
+    return np.fromiter((getattr(obj, name) for obj in objects), dtype=bool, count=len(objects))
+
+def within_radius(xs, ys, center_x, center_y, radius):
+    """中心から radius 以内にある要素を True とするマスクを返す"""
+    dx = xs - center_x
+    dy = ys - center_y
+    return dx * dx + dy * dy <= radius * radius
+
+def overlap_box(objects, left, top, right, bottom):
+    """矩形 (x, y, width, height) が範囲 left < x < right, top < y < bottom と重なる要素を True とするマスクを返す"""
+    count = len(objects)
+    xs = np.fromiter((obj.x for obj in objects), dtype=float, count=count)
+    ys = np.fromiter((obj.y for obj in objects), dtype=float, count=count)
+    widths = np.fromiter((obj.width for obj in objects), dtype=float, count=count)
+    heights = np.fromiter((obj.height for obj in objects), dtype=float, count=count)
+    return (xs < right) & (xs + widths > left) & (ys < bottom) & (ys + heights > top)
+
+def split_by_mask(objects, mask):
+    """mask で要素を (True の要素, False の要素) に一括で振り分ける"""
+    return list(compress(objects, mask)), list(compress(objects, ~mask))
@@ -0,0 +1,60 @@
+import pygame
+import numpy as np
+
+class Starfield:
+    """3層の視差スクロール星空
+
+    星の位置は NumPy 配列で生成し、surfarray で層ごとのタイル画像に1回だけ書き込む。
+    毎フレームは層ごとのスクロール量をまとめて進め、各タイルを2回 blit するだけなので
+    星の数に関係なく描画コストは一定になる。
+    """
+    # (スクロール速度, 星の数, 星の大きさ, 色) 奥の層から順に
+    default_layers = (
+        (0.3, 220, 1, (90, 90, 130)),
+        (0.8, 110, 1, (170, 170, 210)),
+        (1.6, 45, 2, (255, 255, 255))
+    )
+
+    def __init__(self, width, height, bg_color=(0, 0, 50), layers=None, seed=None):
+        self.width = width
+        self.height = height
+        layers = layers if layers is not None else self.default_layers
+        rng = np.random.default_rng(seed)
+
+        self.speeds = np.array([layer[0] for layer in layers], dtype=float)
+        self.offsets = np.zeros(len(layers))
+        self.tiles = []
+        for index, (_, count, size, color) in enumerate(layers):
+            xs = rng.integers(0, width, count)
+            ys = rng.integers(0, height - size + 1, count)
+            self.tiles.append(self._render_layer(xs, ys, size, color, bg_color if index == 0 else None))
+
+    def _render_layer(self, xs, ys, size, color, bg_color):
+        """星の座標配列を surfarray で層のタイル画像に書き込む"""
+        tile = pygame.Surface((self.width, self.height)).convert()
+        if bg_color is not None:
+            tile.fill(bg_color)
+        else:
+            # 手前の層は黒を透明色にして重ねる
+            tile.fill((0, 0, 0))
+            tile.set_colorkey((0, 0, 0))
+
+        pixels = pygame.surfarray.pixels2d(tile)
+        mapped = tile.map_rgb(color)
+        for dx in range(size):
+            # 画面右端を越えた星はタイルの左端に回り込ませる
+            pixels[(xs + dx) % self.width, ys] = mapped
+            for dy in range(1, size):
+                pixels[(xs + dx) % self.width, ys + dy] = mapped
+        del pixels  # surfarray のロックを解除
+        return tile
+
+    def update(self):
+        # 全層のスクロール量をまとめて進める
+        self.offsets = (self.offsets + self.speeds) % self.width
+
+    def draw(self, screen):
+        for tile, offset in zip(self.tiles, self.offsets):
+            x = int(offset)
+            screen.blit(tile, (-x, 0))
+            screen.blit(tile, (self.width - x, 0))
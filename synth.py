@@ -0,0 +1,118 @@
+import numpy as np
+
+# 波形
+SINE = 0
+NOISE = 1
+
+# エンベロープ
+FLAT = 0   # 一定
+GAUSS = 1  # 音符内の center（0〜1）を頂点とする山型。k が大きいほど鋭い
+DECAY = 2  # exp(-k * 経過秒数) で減衰
+
+class NoteTable:
+    """音符の一覧（開始時刻、長さ、周波数、音量、エンベロープ）
+
+    時刻と長さは秒単位。render でまとめて波形にする。
+    """
+    def __init__(self):
+        self.onsets = []
+        self.durations = []
+        self.freqs = []
+        self.amps = []
+        self.waves = []
+        self.envelopes = []
+        self.env_k = []
+        self.env_center = []
+
+    def __len__(self):
+        return len(self.onsets)
+
+    def add(self, onset, duration, freq, amp, envelope=FLAT, k=0.0, center=0.0, wave=SINE):
+        self.onsets.append(onset)
+        self.durations.append(duration)
+        self.freqs.append(freq)
+        self.amps.append(amp)
+        self.waves.append(wave)
+        self.envelopes.append(envelope)
+        self.env_k.append(k)
+        self.env_center.append(center)
+
+    def add_pattern(self, notes, pattern_duration, total_duration, amp, envelope=FLAT, k=0.0, center=0.0):
+        """同じ長さの音符を並べたパターンを、曲の長さに収まる回数だけ繰り返す"""
+        step = pattern_duration / len(notes)
+        for i in range(int(total_duration / pattern_duration)):
+            for j, note in enumerate(notes):
+                self.add(i * pattern_duration + j * step, step, note, amp, envelope, k, center)
+
+    def render(self, duration, sample_rate=22050, seed=None, start=0.0):
+        """start 秒から duration 秒の範囲の音符を1本の波形（float64、モノラル）に合成する
+
+        同じ長さ（サンプル数）の音符を (音符数, サンプル数) の2次元配列にまとめ、
+        波形とエンベロープをブロードキャストで一度に計算する。曲中の音符の長さは数種類しか
+        ないので、波形の計算回数は音符の数によらない。音符ごとに行うのは曲の配列への
+        スライス加算だけ（np.bincount でまとめて足し込むより速い）。
+        範囲の境界をまたぐ音符も音符全体の長さでエンベロープを計算するので、
+        続けて合成した範囲をつなげても継ぎ目はできない。
+        """
+        length = int(sample_rate * duration)
+        if not self.onsets:
+            return np.zeros(length)
+
+        # 音符の位置は合成する範囲の先頭からのサンプル数（負なら範囲より前から鳴っている）
+        onsets = np.asarray(self.onsets, dtype=float)
+        first = int(round(start * sample_rate))
+        starts = (onsets * sample_rate).astype(np.int64)
+        ends = ((onsets + np.asarray(self.durations)) * sample_rate).astype(np.int64)
+        counts = np.where((ends > first) & (starts < first + length), np.clip(ends - starts, 0, None), 0)
+        starts -= first
+
+        freqs = np.asarray(self.freqs, dtype=np.float32)
+        amps = np.asarray(self.amps, dtype=np.float32)
+        waves = np.asarray(self.waves)
+        envelopes = np.asarray(self.envelopes)
+        env_k = np.asarray(self.env_k, dtype=np.float32)
+        env_center = np.asarray(self.env_center, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+
+        track = np.zeros(length)
+        for count in np.unique(counts[counts > 0]):
+            rows = np.flatnonzero(counts == count)
+            t = np.arange(count, dtype=np.float32) / np.float32(sample_rate)
+
+            block = np.sin((np.float32(2 * np.pi) * freqs[rows])[:, None] * t)
+            noisy = waves[rows] == NOISE
+            if noisy.any():
+                block[noisy] = rng.uniform(-1, 1, (np.count_nonzero(noisy), count))
+            block *= amps[rows][:, None]
+
+            kinds = envelopes[rows]
+            gauss = kinds == GAUSS
+            if gauss.any():
+                # 音符の長さ（最初と最後のサンプルの間隔）に対する位置で山型にする
+                span = np.float32(max(0.0001, (count - 1) / sample_rate))
+                center = env_center[rows[gauss]][:, None] * span
+                block[gauss] *= np.exp(-env_k[rows[gauss]][:, None] * (t - center) ** 2 / span ** 2)
+            decay = kinds == DECAY
+            if decay.any():
+                block[decay] *= np.exp(-env_k[rows[decay]][:, None] * t)
+
+            for offset, samples in zip(starts[rows], block):
+                skip = max(0, -offset)
+                end = min(length, offset + count)
+                track[offset + skip:end] += samples[skip:end - offset]
+        return track
+
+class Beat:
+    """一定の周波数で脈打つリズム（正弦波の正の部分だけ）。NoteTable と同じ形で合成できる"""
+    def __init__(self, freq, amp):
+        self.freq = freq
+        self.amp = amp
+
+    def render(self, duration, sample_rate=22050, seed=None, start=0.0):
+        t = start + np.arange(int(sample_rate * duration)) / sample_rate
+        beat = self.amp * np.sin(2 * np.pi * self.freq * t)
+        return beat * (beat > 0)  # Keep only positive parts
+
+def to_stereo_pcm(samples):
+    """[-1, 1] の波形を 16-bit ステレオの配列に変換"""
+    return (np.column_stack((samples, samples)) * 32767).astype(np.int16)
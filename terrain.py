@@ -0,0 +1,233 @@
+import pygame
+import random
+import math
+import copy
+import numpy as np
+
+# タイルの種類
+EMPTY = 0
+ROCK = 1
+CEILING_EDGE = 2
+FLOOR_EDGE = 3
+ASTEROID = 4
+
+class TerrainChunk:
+    """数列分のタイルをまとめたチャンク"""
+    def __init__(self, index, grid, surface, tile_size):
+        self.index = index
+        self.grid = grid  # (columns, rows) のタイルID配列
+        self.surface = surface  # ストリーム時に1回だけ描画したチャンク画像
+        self.areas = self._build_areas(tile_size)  # 画像のうちタイルのある行の帯
+
+    def _build_areas(self, tile_size):
+        """空でない行を連続する帯にまとめ、チャンク画像内の矩形のリストにする"""
+        filled = np.flatnonzero(self.grid.any(axis=0))
+        areas = []
+        if len(filled) == 0:
+            return areas
+        # 行番号が連続しなくなる位置で区切る
+        breaks = np.flatnonzero(np.diff(filled) > 1) + 1
+        width = self.surface.get_width()
+        for run in np.split(filled, breaks):
+            areas.append(pygame.Rect(0, int(run[0]) * tile_size, width, len(run) * tile_size))
+        return areas
+
+class Terrain:
+    """スクロールする地形（洞窟の壁と小惑星）をチャンク単位でストリーミングする"""
+    def __init__(self, screen_width, screen_height, tile_size=40, chunk_columns=8,
+                 scroll_speed=1.5, max_wall_rows=2, asteroid_chance=0.04, seed=None):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.tile_size = tile_size
+        self.chunk_columns = chunk_columns
+        self.chunk_width = tile_size * chunk_columns
+        self.rows = screen_height // tile_size
+        self.scroll_speed = scroll_speed
+        self.scroll_x = 0.0
+        self.max_wall_rows = max_wall_rows
+        self.asteroid_chance = asteroid_chance
+        self.safe_columns = screen_width // tile_size  # 最初の1画面には小惑星を置かない
+
+        self.seed = seed if seed is not None else random.randrange(1 << 30)
+        rng = random.Random(self.seed)
+        self.wall_phases = [rng.uniform(0, 2 * math.pi) for _ in range(4)]
+
+        # タイル画像と当たり判定マスクはロード時に1回だけ作成
+        self.tile_surfaces = {}
+        self.tile_masks = {}
+        self._build_tiles()
+        self._rect_masks = {}  # エンティティ矩形のマスク（サイズごとにキャッシュ）
+
+        # 読み込み済みチャンク
+        self.chunks = {}
+        self.window = np.zeros((0, self.rows), dtype=np.int8)  # 読み込み済みチャンクを連結したタイル配列
+        self.window_start_col = 0
+        self._stream()
+
+    def _build_tiles(self):
+        """タイルの画像と pygame.mask を作成"""
+        size = self.tile_size
+        rock_color = (90, 70, 60)
+        edge_color = (130, 100, 80)
+
+        rock = pygame.Surface((size, size), pygame.SRCALPHA)
+        rock.fill(rock_color)
+
+        # 天井の下端（ギザギザの下辺）
+        ceiling = pygame.Surface((size, size), pygame.SRCALPHA)
+        ceiling_points = [(0, 0), (size, 0), (size, size * 0.6), (size * 0.75, size * 0.85),
+                          (size * 0.5, size * 0.55), (size * 0.25, size * 0.9), (0, size * 0.65)]
+        pygame.draw.polygon(ceiling, rock_color, ceiling_points)
+        pygame.draw.lines(ceiling, edge_color, False, ceiling_points[2:], 2)
+
+        # 床の上端（天井を上下反転）
+        floor = pygame.transform.flip(ceiling, False, True)
+
+        # 小惑星
+        asteroid = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(asteroid, (120, 110, 100), (size // 2, size // 2), size // 2 - 2)
+        pygame.draw.circle(asteroid, (90, 80, 75), (size // 3, size // 3), size // 8)
+        pygame.draw.circle(asteroid, (90, 80, 75), (size * 2 // 3, size * 3 // 5), size // 10)
+
+        for tile_id, surface in ((ROCK, rock), (CEILING_EDGE, ceiling),
+                                 (FLOOR_EDGE, floor), (ASTEROID, asteroid)):
+            self.tile_surfaces[tile_id] = surface
+            self.tile_masks[tile_id] = pygame.mask.from_surface(surface)
+
+    def _wall_heights(self, cols):
+        """列ごとの天井と床の厚さ（タイル数）を計算（列番号だけで決まる）"""
+        p = self.wall_phases
+        ceiling = 1 + np.sin(cols * 0.21 + p[0]) + 0.6 * np.sin(cols * 0.07 + p[1])
+        floor = 1 + np.sin(cols * 0.17 + p[2]) + 0.6 * np.sin(cols * 0.05 + p[3])
+        ceiling = np.clip(np.rint(ceiling), 0, self.max_wall_rows).astype(int)
+        floor = np.clip(np.rint(floor), 0, self.max_wall_rows).astype(int)
+        return ceiling, floor
+
+    def _generate_chunk(self, index):
+        """チャンクのタイル配列を生成し、画像を1回だけ描画"""
+        first_col = index * self.chunk_columns
+        cols = np.arange(first_col, first_col + self.chunk_columns)
+        ceiling, floor = self._wall_heights(cols)
+
+        rows = np.arange(self.rows)
+        grid = np.zeros((self.chunk_columns, self.rows), dtype=np.int8)
+        grid[rows[None, :] < ceiling[:, None] - 1] = ROCK
+        grid[rows[None, :] == ceiling[:, None] - 1] = CEILING_EDGE
+        grid[rows[None, :] > self.rows - floor[:, None]] = ROCK
+        grid[rows[None, :] == self.rows - floor[:, None]] = FLOOR_EDGE
+
+        # 小惑星はチャンク番号から決まる乱数で配置
+        rng = random.Random(self.seed * 1000003 + index)
+        for i, col in enumerate(cols):
+            if col >= self.safe_columns and rng.random() < self.asteroid_chance:
+                row = rng.randint(ceiling[i] + 1, self.rows - floor[i] - 2)
+                grid[i, row] = ASTEROID
+
+        surface = pygame.Surface((self.chunk_width, self.rows * self.tile_size), pygame.SRCALPHA)
+        for col, row in zip(*np.nonzero(grid)):
+            surface.blit(self.tile_surfaces[grid[col, row]], (col * self.tile_size, row * self.tile_size))
+
+        return TerrainChunk(index, grid, surface, self.tile_size)
+
+    def _stream(self):
+        """スクロール位置の先にあるチャンクを読み込み、後ろのチャンクを破棄"""
+        first = int(self.scroll_x // self.chunk_width)
+        last = int((self.scroll_x + self.screen_width + self.chunk_width) // self.chunk_width)
+
+        changed = False
+        for index in list(self.chunks):
+            if index < first:
+                del self.chunks[index]
+                changed = True
+        for index in range(first, last + 1):
+            if index not in self.chunks:
+                self.chunks[index] = self._generate_chunk(index)
+                changed = True
+
+        if changed:
+            indices = sorted(self.chunks)
+            self.window = np.concatenate([self.chunks[i].grid for i in indices])
+            self.window_start_col = indices[0] * self.chunk_columns
+
+    def update(self):
+        self.scroll_x += self.scroll_speed
+        self._stream()
+
+    def snapshot(self):
+        """描画用のコピー（チャンクの辞書は読み込みと破棄で変わるため複製）"""
+        frozen = copy.copy(self)
+        frozen.chunks = dict(self.chunks)
+        return frozen
+
+    def draw(self, screen):
+        # チャンク画像は画面の高さがあるが、タイルのある行（上下の壁と小惑星の行）だけを描く
+        items = []
+        for index, chunk in self.chunks.items():
+            x = index * self.chunk_width - self.scroll_x
+            if x < self.screen_width and x + self.chunk_width > 0:
+                x = int(x)
+                for area in chunk.areas:
+                    items.append((chunk.surface, (x, area.y), area))
+        screen.blits(items, doreturn=False)
+
+    def get_draw_rects(self):
+        """スクロールで毎フレーム変化する範囲（上下の壁の帯と小惑星）"""
+        size = self.tile_size
+        band = self.max_wall_rows * size
+        rects = [pygame.Rect(0, 0, self.screen_width, band),
+                 pygame.Rect(0, self.rows * size - band, self.screen_width, band)]
+        cols, rows = np.nonzero(self.window == ASTEROID)
+        for col, row in zip(cols, rows):
+            x = (col + self.window_start_col) * size - self.scroll_x
+            if -size * 2 < x < self.screen_width:
+                # 前フレームの位置も含めるため、スクロール量だけ右に広げる
+                rects.append(pygame.Rect(int(x), row * size, size + int(self.scroll_speed) + 1, size))
+        return rects
+
+    def _tile_at(self, col, row):
+        col -= self.window_start_col
+        if 0 <= col < len(self.window) and 0 <= row < self.rows:
+            return self.window[col, row]
+        return EMPTY
+
+    def collide_rect(self, x, y, width, height):
+        """矩形（画面座標）と地形の当たり判定。重なっているタイルのみマスクで判定"""
+        world_x = int(x + self.scroll_x)
+        y = int(y)
+        width = max(1, int(width))
+        height = max(1, int(height))
+        size = self.tile_size
+
+        rect_mask = self._rect_masks.get((width, height))
+        if rect_mask is None:
+            rect_mask = pygame.Mask((width, height), fill=True)
+            self._rect_masks[(width, height)] = rect_mask
+
+        for col in range(world_x // size, (world_x + width - 1) // size + 1):
+            for row in range(y // size, (y + height - 1) // size + 1):
+                tile_id = self._tile_at(col, row)
+                if tile_id == EMPTY:
+                    continue
+                offset = (world_x - col * size, y - row * size)
+                if self.tile_masks[tile_id].overlap(rect_mask, offset):
+                    return True
+        return False
+
+    def collide_points(self, xs, ys):
+        """点群（画面座標の配列）と地形の当たり判定をまとめて行い、マスクを返す"""
+        world_x = (xs + self.scroll_x).astype(int)
+        world_y = ys.astype(int)
+        size = self.tile_size
+        cols = world_x // size - self.window_start_col
+        rows = world_y // size
+
+        inside = (cols >= 0) & (cols < len(self.window)) & (rows >= 0) & (rows < self.rows)
+        hits = np.zeros(len(xs), dtype=bool)
+        tile_ids = np.zeros(len(xs), dtype=np.int8)
+        tile_ids[inside] = self.window[cols[inside], rows[inside]]
+
+        # 空でないタイルに入っている点だけピクセル単位で判定
+        for i in np.flatnonzero(tile_ids):
+            mask = self.tile_masks[tile_ids[i]]
+            hits[i] = mask.get_at((world_x[i] % size, world_y[i] % size))
+        return hits